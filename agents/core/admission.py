@@ -0,0 +1,90 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque
+
+from agents.core.config import settings
+
+class AdmissionRejected(Exception):
+    """The server is at capacity; the client should retry after `retry_after` seconds (sent as 429)."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+class AdmissionController:
+    """
+    Caps how many runs (flows/crews started from a request) execute at once.
+    Up to `max_active` run immediately, up to `max_queued` more wait in arrival
+    order, and anything past that is rejected with an estimate of when a slot
+    will free up. Lives on the event loop; not thread-safe.
+    """
+
+    def __init__(self, max_active: int, max_queued: int, default_run_seconds: float = 60.0):
+        if max_active < 1:
+            raise ValueError(f"max_active must be at least 1, got {max_active}")
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Moving average of run durations, for Retry-After
+        self._avg_run_seconds = default_run_seconds
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> float:
+        return self._avg_run_seconds * (self.queued + 1) / self.max_active
+
+    @asynccontextmanager
+    async def admit(self, wait: bool = False):
+        """
+        Hold a run slot for the block. With `wait` the caller queues even past `max_queued`
+        instead of being rejected; for callers that bound their own concurrency, like batches.
+        """
+        await self._acquire(wait)
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * (time.monotonic() - start_time)
+            self._release()
+
+    async def _acquire(self, wait: bool = False) -> None:
+        if self.active < self.max_active and not self._waiters:
+            self.active += 1
+            return
+        if not wait and self.queued >= self.max_queued:
+            raise AdmissionRejected(
+                f"Server is busy ({self.active} runs active, {self.queued} queued)",
+                self.retry_after(),
+            )
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the caller went away; pass it on
+                self._release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def _release(self) -> None:
+        # Hand the slot straight to the oldest waiter so late arrivals can't jump the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def status(self) -> dict:
+        return {"active": self.active, "queued": self.queued, "max_active": self.max_active, "max_queued": self.max_queued}
+
+# Shared by every endpoint that starts a flow or crew run inline
+run_admission = AdmissionController(settings.RUN_MAX_ACTIVE, settings.RUN_MAX_QUEUED)
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, Optional, Tuple
+
+from agents.core.storage import connect_sqlite
+
+def _json_default(value: Any):
+    # Pydantic models and paths show up in flow inputs/outputs
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, Path):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def to_json(value: Any) -> str:
+    """Serialize a value to canonical JSON (sorted keys, no whitespace)."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=_json_default)
+
+def canonical_hash(*parts: Any) -> str:
+    """
+    Hash any JSON-serializable values into a stable cache key.
+    Dict ordering and pydantic vs dict representations don't change the key.
+    """
+    return hashlib.sha256(to_json(parts).encode("utf-8")).hexdigest()
+
+def file_fingerprint(paths: Iterable[str | Path]) -> str:
+    """Hash the names and contents of a set of files, e.g. prompt YAML configs."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(p) for p in paths):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+class BaseCache(ABC):
+    """Interface for cache tiers. Values must be JSON-serializable."""
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[1] if entry is not None else None
+
+    @abstractmethod
+    def get_entry(self, key: str) -> Optional[Tuple[float, Any]]:
+        """The entry's creation time and value, or None if it's missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, created_at: Optional[float] = None) -> None:
+        """Store a value; `created_at` (default now) is what its TTL counts from."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+class MemoryCache(BaseCache):
+    """
+    Process-local LRU cache with a per-entry TTL. Values are stored as JSON, so callers
+    get their own copy and mutating it can't change what later reads see.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, _ = entry
+            if self.ttl is not None and time.time() - created_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return created_at, json.loads(entry[1])
+
+    def set(self, key: str, value: Any, created_at: Optional[float] = None) -> None:
+        payload = to_json(value)
+        with self._lock:
+            self._entries[key] = (created_at if created_at is not None else time.time(), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class SQLiteCache(BaseCache):
+    """
+    On-disk cache backed by a single SQLite file.
+    Entries expire after `ttl` seconds and the least recently used entries are
+    evicted once the stored payloads exceed `max_bytes`.
+    """
+
+    def __init__(self, path: str | Path, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = connect_sqlite(path)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def get_entry(self, key: str) -> Optional[Tuple[float, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return created_at, json.loads(value)
+
+    def set(self, key: str, value: Any, created_at: Optional[float] = None) -> None:
+        payload = to_json(value)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), created_at if created_at is not None else now, now),
+            )
+            self._evict(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM cache")
+
+    def _evict(self, now: float) -> None:
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM cache WHERE created_at < ?", (now - self.ttl,))
+        if self.max_bytes is None:
+            return
+        (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until we're back under budget
+        for key, size in self._db.execute("SELECT key, size FROM cache ORDER BY accessed_at").fetchall():
+            self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+class TieredCache(BaseCache):
+    """
+    Checks each tier in order (fastest first) and backfills the faster tiers on a hit,
+    keeping the entry's creation time so it expires there when it does in the slower tier.
+    Writes go to every tier.
+    """
+
+    def __init__(self, *tiers: BaseCache):
+        self.tiers = tiers
+
+    def get_entry(self, key: str) -> Optional[Tuple[float, Any]]:
+        for i, tier in enumerate(self.tiers):
+            entry = tier.get_entry(key)
+            if entry is not None:
+                created_at, value = entry
+                for faster_tier in self.tiers[:i]:
+                    faster_tier.set(key, value, created_at)
+                return entry
+        return None
+
+    def set(self, key: str, value: Any, created_at: Optional[float] = None) -> None:
+        for tier in self.tiers:
+            tier.set(key, value, created_at)
+
+    def delete(self, key: str) -> None:
+        for tier in self.tiers:
+            tier.delete(key)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+def create_cache(name: str, ttl: Optional[float], memory_entries: int, max_bytes: Optional[int], cache_dir: str | Path) -> TieredCache:
+    """Build the standard memory + SQLite cache stored at `<cache_dir>/<name>.sqlite3`."""
+    return TieredCache(
+        MemoryCache(max_entries=memory_entries, ttl=ttl),
+        SQLiteCache(Path(cache_dir) / f"{name}.sqlite3", ttl=ttl, max_bytes=max_bytes),
+    )
@@ -0,0 +1,241 @@
+"""
+Structured index of the CFSC regression/progression sheet.
+
+The sheet is a single table: each column holds one or more categories (Power,
+Anti-Rotation, Knee Dominant, ...), each category is split into groups by blank
+rows, and each group lists its variants easiest first. `extract_catalog` turns
+the PDF into that category -> group -> ordered variants structure offline;
+`ExerciseCatalog` answers "what's next / what's easier" with a dict lookup.
+
+Regenerate the checked-in catalog after the PDF changes with:
+
+    python -m agents.core.cfsc_catalog
+"""
+import difflib
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from agents.core.knowledge import CFSC_PDF, content_hash
+from agents.core.registry import registry
+
+KNOWLEDGE_DIR = Path(__file__).resolve().parents[1] / "knowledge"
+CATALOG_PATH = KNOWLEDGE_DIR / "cfsc_catalog.json"
+
+# Headers as they appear on the sheet. A cell matching one starts a new category
+# in its column, even midway down (e.g. Knee Dominant under Vertical Pull).
+CATEGORIES = [
+    "Power",
+    "Ladder Drills",
+    "Motor Control",
+    "Anti-Extension/Rotation",
+    "Anti-Lateral Flexion",
+    "Anti-Rotation",
+    "Anti-Extension",
+    "Horizontal Press",
+    "Vertical Press",
+    "Horizontal Pull",
+    "Vertical Pull",
+    "Knee Dominant",
+    "Hip Dominant",
+]
+# Table columns holding exercises; the ones in between are spacers and col 0 of
+# the top rows is the abbreviation key
+EXERCISE_COLUMNS = [0, 2, 4, 6, 8, 10]
+KEY_ROWS_END = "RFE = Rear Foot Elevated"
+LABELS = {"PHASE 1:"}
+
+class CatalogVariant(BaseModel):
+    name: str
+    baseline: bool = Field(False, description="Bold on the sheet: the default starting variant for the group")
+
+class CatalogGroup(BaseModel):
+    variants: List[CatalogVariant] = Field(default_factory=list)
+    notes: List[str] = Field(default_factory=list)
+
+class CatalogData(BaseModel):
+    source: str
+    source_sha256: str
+    categories: Dict[str, List[CatalogGroup]]
+
+# From the sheet's key, so "KB Swing" and "Kettlebell Swing" are the same exercise
+ABBREVIATIONS = {
+    "tk": "tall kneeling",
+    "bw": "bodyweight",
+    "kb": "kettlebell",
+    "db": "dumbbell",
+    "iso": "isometric",
+    "ecc": "eccentric",
+    "sl": "single leg",
+    "sldl": "single leg deadlift",
+    "alt": "alternating",
+    "fe": "feet elevated",
+    "oh": "overhead",
+    "rfe": "rear foot elevated",
+}
+
+def normalize_name(name: str) -> str:
+    """Case, spacing, hyphen and abbreviation-insensitive key ("KB Push-Up" == "kettlebell push up")."""
+    name = name.lower().replace("*", "").replace("-", " ")
+    name = re.sub(r"\s*([/&@])\s*", r"\1", name)
+    name = re.sub(r"[^a-z0-9/&@+. ]", "", name)
+    name = re.sub(r"\b[a-z]+\b", lambda m: ABBREVIATIONS.get(m.group(0), m.group(0)), name)
+    return re.sub(r"\s+", " ", name).strip()
+
+def _is_note(text: str, italic: bool) -> bool:
+    return italic or text.startswith("*") or text.lower().startswith("regress to")
+
+def _cell_fonts(page, bbox) -> Tuple[bool, bool]:
+    chars = [c for c in page.crop(bbox).chars if c["text"].strip()]
+    if not chars:
+        return False, False
+    bold = sum("Bold" in c["fontname"] for c in chars) > len(chars) / 2
+    italic = sum("Italic" in c["fontname"] for c in chars) > len(chars) / 2
+    return bold, italic
+
+def extract_catalog(pdf_path: Path = KNOWLEDGE_DIR / CFSC_PDF) -> CatalogData:
+    """Parse the sheet into categories of ordered groups. Needs pdfplumber; only run offline."""
+    import pdfplumber
+
+    categories: Dict[str, List[CatalogGroup]] = {}
+    with pdfplumber.open(pdf_path) as pdf:
+        page = pdf.pages[0]
+        table = page.find_tables()[0]
+        rows = table.extract()
+        cells = [row.cells for row in table.rows]
+
+        for column in EXERCISE_COLUMNS:
+            category: Optional[str] = None
+            group: Optional[CatalogGroup] = None
+            in_key = column == 0
+            for row_index, row in enumerate(rows):
+                text = re.sub(r"\s+", " ", row[column] or "").strip()
+                if in_key:
+                    in_key = text != KEY_ROWS_END
+                    continue
+                if text in CATEGORIES:
+                    category, group = text, None
+                    continue
+                if not text or text in LABELS or category is None:
+                    # Blank rows separate groups within a category
+                    group = None
+                    continue
+                bbox = cells[row_index][column]
+                bold, italic = _cell_fonts(page, bbox) if bbox else (False, False)
+                if group is None:
+                    group = CatalogGroup()
+                    categories.setdefault(category, []).append(group)
+                if _is_note(text, italic):
+                    # Footnotes run on into the next columns' cells
+                    spill = "".join(row[c] or "" for c in range(column + 1, len(row)))
+                    group.notes.append((text + spill).strip().lstrip("* "))
+                else:
+                    # A trailing asterisk points at a footnote; the note is kept on the group
+                    group.variants.append(CatalogVariant(name=text.rstrip("* "), baseline=bold))
+
+    for name, groups in categories.items():
+        categories[name] = [g for g in groups if g.variants]
+    return CatalogData(
+        source=Path(pdf_path).name,
+        source_sha256=content_hash(Path(pdf_path)),
+        categories=categories,
+    )
+
+class CatalogEntry(BaseModel):
+    name: str
+    category: str
+    group: int
+    position: int
+
+class ExerciseCatalog:
+    """
+    Progression lookups over the extracted sheet. Names are matched loosely
+    (case, spacing, punctuation) and then fuzzily, since plans don't always
+    reproduce the sheet's wording exactly.
+    """
+
+    def __init__(self, data: CatalogData, fuzzy_cutoff: float = 0.85):
+        self.data = data
+        self.fuzzy_cutoff = fuzzy_cutoff
+        # The same variant can appear in more than one group (e.g. Straight Arm Plank)
+        self._index: Dict[str, List[CatalogEntry]] = {}
+        # The same entries per category, for lookups that must stay in one
+        self._category_index: Dict[str, Dict[str, List[CatalogEntry]]] = {}
+        for category, groups in data.categories.items():
+            category_index = self._category_index.setdefault(normalize_name(category), {})
+            for group_index, group in enumerate(groups):
+                for position, variant in enumerate(group.variants):
+                    entry = CatalogEntry(name=variant.name, category=category, group=group_index, position=position)
+                    self._index.setdefault(normalize_name(variant.name), []).append(entry)
+                    category_index.setdefault(normalize_name(variant.name), []).append(entry)
+
+    @classmethod
+    def from_file(cls, path: Path = CATALOG_PATH) -> "ExerciseCatalog":
+        return cls(CatalogData.model_validate_json(Path(path).read_text()))
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self.data.categories)
+
+    def find(self, exercise: str, category: Optional[str] = None, strict: bool = False) -> Optional[CatalogEntry]:
+        """
+        Locate an exercise on the sheet, preferring `category` when it appears in several.
+        With `strict`, only exercises in `category` match, fuzzily or not.
+        """
+        key = normalize_name(exercise)
+        index = self._category_index.get(normalize_name(category), {}) if strict and category else self._index
+        entries = index.get(key)
+        if not entries:
+            matches = difflib.get_close_matches(key, list(index), n=1, cutoff=self.fuzzy_cutoff)
+            if not matches:
+                return None
+            entries = index[matches[0]]
+        if category:
+            for entry in entries:
+                if normalize_name(entry.category) == normalize_name(category):
+                    return entry
+        return entries[0]
+
+    def group(self, exercise: str, category: Optional[str] = None) -> List[str]:
+        """All variants in the exercise's group, easiest first."""
+        entry = self.find(exercise, category)
+        if entry is None:
+            return []
+        return [v.name for v in self.data.categories[entry.category][entry.group].variants]
+
+    def next_progression(self, exercise: str, category: Optional[str] = None, strict: bool = False) -> Optional[str]:
+        """The next harder variant, or None if the exercise is unknown or already the hardest."""
+        entry = self.find(exercise, category, strict)
+        if entry is None:
+            return None
+        variants = self.data.categories[entry.category][entry.group].variants
+        if entry.position + 1 >= len(variants):
+            return None
+        return variants[entry.position + 1].name
+
+    def progressions(self, exercise: str, category: Optional[str] = None) -> List[str]:
+        """Every harder variant, nearest first."""
+        entry = self.find(exercise, category)
+        if entry is None:
+            return []
+        variants = self.data.categories[entry.category][entry.group].variants
+        return [v.name for v in variants[entry.position + 1:]]
+
+    def regressions(self, exercise: str, category: Optional[str] = None) -> List[str]:
+        """Every easier variant, nearest first."""
+        entry = self.find(exercise, category)
+        if entry is None:
+            return []
+        variants = self.data.categories[entry.category][entry.group].variants
+        return [v.name for v in reversed(variants[:entry.position])]
+
+registry.register("cfsc_catalog", ExerciseCatalog.from_file)
+
+if __name__ == "__main__":
+    catalog = extract_catalog()
+    CATALOG_PATH.write_text(json.dumps(catalog.model_dump(mode="json"), indent=2) + "\n")
+    total = sum(len(g.variants) for groups in catalog.categories.values() for g in groups)
+    print(f"Wrote {total} variants in {len(catalog.categories)} categories to {CATALOG_PATH}")
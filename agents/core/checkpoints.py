@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from agents.core.cache import to_json
+from agents.core.config import settings
+from agents.core.storage import connect_sqlite
+
+class CheckpointStore:
+    """
+    Flow step results in a SQLite file, keyed by run ID, so a run that fails part way
+    (or whose process dies) can be re-invoked and pick up after its last completed work.
+    A step is saved whole (part "") or in parts, e.g. one per day, as they complete.
+    Each checkpoint records the hash of the run's inputs and is only returned for the
+    same inputs, so reusing a run ID for a different request starts fresh.
+    """
+
+    def __init__(self, path: str | Path):
+        self._lock = threading.Lock()
+        self._db = connect_sqlite(path)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                run_id TEXT NOT NULL,
+                step TEXT NOT NULL,
+                part TEXT NOT NULL,
+                inputs TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, step, part)
+            )
+            """
+        )
+
+    def get(self, run_id: str, inputs: str, step: str, part: str = "") -> Optional[Any]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM checkpoints WHERE run_id = ? AND step = ? AND part = ? AND inputs = ?",
+                (run_id, step, part, inputs),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def parts(self, run_id: str, inputs: str, step: str) -> Dict[str, Any]:
+        """Every saved part of a step, by part name."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT part, value FROM checkpoints WHERE run_id = ? AND step = ? AND inputs = ? AND part != ''",
+                (run_id, step, inputs),
+            ).fetchall()
+        return {part: json.loads(value) for part, value in rows}
+
+    def put(self, run_id: str, inputs: str, step: str, value: Any, part: str = "") -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, step, part, inputs, value, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, step, part, inputs, to_json(value), time.time()),
+            )
+
+    def discard_other_inputs(self, run_id: str, inputs: str) -> int:
+        """Drop a run's checkpoints from different inputs; they can never be resumed."""
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM checkpoints WHERE run_id = ? AND inputs != ?", (run_id, inputs))
+        return cursor.rowcount
+
+    def clear(self, run_id: str) -> int:
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+        return cursor.rowcount
+
+    def purge(self, older_than: float) -> int:
+        """Delete checkpoints last written more than `older_than` seconds ago."""
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM checkpoints WHERE updated_at < ?", (time.time() - older_than,))
+        return cursor.rowcount
+
+checkpoints = CheckpointStore(settings.CHECKPOINT_DB_PATH)
@@ -0,0 +1,139 @@
+"""
+Compact program representation: week 1 in full, then each later week as the
+changes it makes to week 1 (reps, RPE, variant, rounds, rest). Movement prep and
+the finisher repeat every week by design, so they're normally stored once.
+
+Full weeks are only rebuilt when something needs them, e.g. the Excel export or
+`?expand=true` on the JSON endpoints.
+
+A changed exercise name is a new variant, and its library id goes with it: the delta
+always records the id alongside the new name (absent when the variant has none), and
+a name without an id expands to an exercise without one, never the base exercise's.
+Days are matched by their day letter, which must be unique within a week.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from agents.models.workout import (
+    Circuit,
+    CircuitDelta,
+    CompactProgram,
+    DayDelta,
+    ExerciseDelta,
+    WeekDelta,
+    WorkoutPlan,
+)
+
+CIRCUITS = ("circuit_1", "circuit_2")
+EXERCISE_FIELDS = ("name", "exercise_id", "reps", "rpe")
+
+def _circuit_delta(base: Circuit, circuit: Circuit) -> Optional[CircuitDelta]:
+    if len(base.exercises) != len(circuit.exercises):
+        return CircuitDelta(circuit=circuit)
+    exercises = []
+    for index, (base_exercise, exercise) in enumerate(zip(base.exercises, circuit.exercises)):
+        # Only changed fields are set on the delta, so an id changed to None is recorded too
+        changes = {field: getattr(exercise, field) for field in EXERCISE_FIELDS if getattr(exercise, field) != getattr(base_exercise, field)}
+        if "name" in changes:
+            # Even when it's unchanged, so a renamed exercise keeps its id on expansion
+            changes["exercise_id"] = exercise.exercise_id
+        if changes:
+            exercises.append(ExerciseDelta(index=index, **changes))
+    delta = CircuitDelta(
+        rounds=circuit.rounds if circuit.rounds != base.rounds else None,
+        rest=circuit.rest if circuit.rest != base.rest else None,
+        exercises=exercises,
+    )
+    return delta if delta.rounds is not None or delta.rest is not None or exercises else None
+
+def _day_delta(base: WorkoutPlan, plan: WorkoutPlan) -> Optional[DayDelta]:
+    changes: Dict[str, Any] = {}
+    for field in ("power", "finisher", "movement_prep"):
+        if getattr(plan, field) != getattr(base, field):
+            changes[field] = getattr(plan, field)
+    for field in CIRCUITS:
+        circuit_delta = _circuit_delta(getattr(base, field), getattr(plan, field))
+        if circuit_delta is not None:
+            changes[field] = circuit_delta
+    return DayDelta(day=base.day, **changes) if changes else None
+
+def _days_by_letter(week: List[WorkoutPlan], week_num: int) -> Dict[str, WorkoutPlan]:
+    days = {plan.day: plan for plan in week}
+    if len(days) != len(week):
+        raise ValueError(f"Week {week_num} repeats a day: {[plan.day for plan in week]}")
+    return days
+
+def compact_program(weeks: List[List[WorkoutPlan]]) -> CompactProgram:
+    """Compact a program given as weeks of day plans, where every week has week 1's days (in any order)."""
+    base_week, *later_weeks = weeks
+    _days_by_letter(base_week, 1)
+    week_deltas = []
+    for week_num, week in enumerate(later_weeks, 2):
+        plans = _days_by_letter(week, week_num)
+        if plans.keys() != {base.day for base in base_week}:
+            raise ValueError(f"Week {week_num} has days {sorted(plans)}, week 1 has {[base.day for base in base_week]}")
+        days = [delta for base in base_week if (delta := _day_delta(base, plans[base.day])) is not None]
+        week_deltas.append(WeekDelta(week=week_num, days=days))
+    return CompactProgram(base_week=base_week, weeks=week_deltas)
+
+def _apply_circuit(base: Circuit, delta: Optional[CircuitDelta]) -> Circuit:
+    if delta is None:
+        return base
+    if delta.circuit is not None:
+        return delta.circuit
+    exercises = list(base.exercises)
+    for change in delta.exercises:
+        update = change.changes()
+        if "name" in update:
+            # A new variant only has the library id its delta records
+            update.setdefault("exercise_id", None)
+        exercises[change.index] = exercises[change.index].model_copy(update=update)
+    update: Dict[str, Any] = {"exercises": exercises}
+    if delta.rounds is not None:
+        update["rounds"] = delta.rounds
+    if delta.rest is not None:
+        update["rest"] = delta.rest
+    return base.model_copy(update=update)
+
+def _apply_day(base: WorkoutPlan, delta: Optional[DayDelta]) -> WorkoutPlan:
+    if delta is None:
+        return base
+    update = delta.model_dump(include={"power", "finisher"}, exclude_none=True)
+    if delta.movement_prep is not None:
+        update["movement_prep"] = delta.movement_prep
+    for field in CIRCUITS:
+        update[field] = _apply_circuit(getattr(base, field), getattr(delta, field))
+    return base.model_copy(update=update)
+
+def expand_week(program: CompactProgram, week_num: int) -> List[WorkoutPlan]:
+    """The full day plans for one week (1-based)."""
+    if week_num == 1:
+        return list(program.base_week)
+    week = next((week for week in program.weeks if week.week == week_num), None)
+    if week is None:
+        raise KeyError(f"Program has no week {week_num}")
+    day_deltas = {delta.day: delta for delta in week.days}
+    return [_apply_day(base, day_deltas.get(base.day)) for base in program.base_week]
+
+def iter_weeks(program: CompactProgram) -> Iterator[Tuple[str, List[WorkoutPlan]]]:
+    """("weekN", day plans) for every week, each expanded only when it's reached."""
+    yield "week1", expand_week(program, 1)
+    for week in program.weeks:
+        yield f"week{week.week}", expand_week(program, week.week)
+
+def expand_program(program: CompactProgram) -> Dict[str, List[dict]]:
+    """The old `full_program` shape: {"week1": [day plan dicts], ...}."""
+    return {week_key: [plan.model_dump() for plan in plans] for week_key, plans in iter_weeks(program)}
+
+def program_weeks(program_data: dict) -> Iterator[Tuple[str, List[Any]]]:
+    """Weeks of a flow result, whether it holds a compact `program` or an already expanded `full_program`."""
+    if "full_program" in program_data:
+        return iter(program_data["full_program"].items())
+    return iter_weeks(CompactProgram.model_validate(program_data["program"]))
+
+def expand_result(program_data: dict) -> dict:
+    """A flow result with its compact program swapped for the full week-by-week program."""
+    if "program" not in program_data:
+        return program_data
+    expanded = {key: value for key, value in program_data.items() if key != "program"}
+    expanded["full_program"] = expand_program(CompactProgram.model_validate(program_data["program"]))
+    return expanded
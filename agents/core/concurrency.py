@@ -0,0 +1,56 @@
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from agents.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+async def gather_bounded(
+    items: Iterable[T],
+    func: Callable[[T], Awaitable[R]],
+    limit: int,
+    timeout: Optional[float] = None,
+    retries: int = 0,
+    backoff: float = 1.0,
+) -> List[R]:
+    """
+    Run `func` over every item with at most `limit` calls in flight.
+    Each call gets `timeout` seconds per attempt. A call that raises is retried up to
+    `retries` times with exponential backoff; one that times out is not, since it
+    would most likely time out again. Results are returned in the same order as `items`.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(item: T) -> R:
+        attempt = 0
+        while True:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(func(item), timeout)
+                except asyncio.TimeoutError:
+                    raise
+                except Exception as e:
+                    if attempt >= retries:
+                        raise
+                    logger.warning("Attempt %d failed (%r), retrying", attempt + 1, e)
+            # Back off outside the semaphore so other items can use the slot
+            await asyncio.sleep(backoff * (2 ** attempt))
+            attempt += 1
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+# Crews run synchronously and their threads block while LLM calls wait on the scheduler,
+# so they get a pool of their own rather than asyncio's default one (used by asyncio.to_thread)
+crew_executor = ThreadPoolExecutor(max_workers=settings.CREW_MAX_THREADS, thread_name_prefix="crew")
+
+async def kickoff_crew(crew: Any, inputs: Optional[Dict[str, Any]] = None) -> Any:
+    """Crew.kickoff_async, but in crew_executor. The thread keeps the caller's context (its run ID)."""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(crew_executor, functools.partial(context.run, crew.kickoff, inputs))
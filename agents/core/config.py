@@ -1,8 +1,14 @@
-from typing import Set
+from pathlib import Path
+from typing import Dict, Optional, Set
 
-from pydantic import Field
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# The repository root (agents/ is a package inside it)
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+# Settings naming files or directories the app writes to; relative values are under DATA_ROOT
+STORAGE_PATH_SETTINGS = ("CACHE_DIR", "JOB_DB_PATH", "CHECKPOINT_DB_PATH", "OUTLINE_TEMPLATE_DB_PATH", "BATCH_EXPORT_DIR")
+
 class Settings(BaseSettings):
     # CORS
     CORS_ORIGINS: Set[str] = Field(..., env="CORS_ORIGINS")
@@ -10,6 +16,9 @@ class Settings(BaseSettings):
     # PORT
     PORT: int = Field(..., env="PORT")
 
+    # Level for the app's own module loggers (agents.*)
+    LOG_LEVEL: str = Field("INFO", env="LOG_LEVEL")
+
     # LLMS
     OPENAI_API_KEY: str = Field(..., env="OPENAI_API_KEY")
     GROQ_API_KEY: str = Field(..., env="GROQ_API_KEY")
@@ -18,6 +27,86 @@ class Settings(BaseSettings):
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
     TEST_DATABASE_URL: str = Field(..., env="TEST_DATABASE_URL")
     EXPIRE_ON_COMMIT: bool = False
+    # Shared Prisma client: query engine pool size, wait for a free connection and connect timeout (seconds)
+    DATABASE_POOL_SIZE: int = Field(10, env="DATABASE_POOL_SIZE")
+    DATABASE_POOL_TIMEOUT: float = Field(10.0, env="DATABASE_POOL_TIMEOUT")
+    DATABASE_CONNECT_TIMEOUT: float = Field(10.0, env="DATABASE_CONNECT_TIMEOUT")
+    # Seconds between checks of the Exercise table's max(updatedAt)/count by the in-memory catalog
+    EXERCISE_CATALOG_CHECK_INTERVAL: float = Field(30.0, env="EXERCISE_CATALOG_CHECK_INTERVAL")
+
+    # Startup
+    WARM_UP_ON_STARTUP: bool = Field(True, env="WARM_UP_ON_STARTUP")
+
+    # Where relative cache and data paths below are resolved, whatever the working directory
+    DATA_ROOT: str = Field(str(PROJECT_ROOT), env="DATA_ROOT")
+
+    # Program Flow
+    PROGRAM_FLOW_MAX_CONCURRENCY: int = Field(4, env="PROGRAM_FLOW_MAX_CONCURRENCY")
+    PROGRAM_FLOW_CREW_TIMEOUT: float = Field(300.0, env="PROGRAM_FLOW_CREW_TIMEOUT")
+    PROGRAM_FLOW_CREW_RETRIES: int = Field(1, env="PROGRAM_FLOW_CREW_RETRIES")
+    # "rules" applies the progression rules in Python, "creative" asks program_progression_crew
+    PROGRAM_PROGRESSION_MODE: str = Field("rules", env="PROGRAM_PROGRESSION_MODE")
+    # Most tokens (model tokenizer) the summary prompt may use; the program digest is trimmed to fit
+    PROGRAM_SUMMARY_PROMPT_TOKENS: int = Field(3000, env="PROGRAM_SUMMARY_PROMPT_TOKENS")
+    # Week outlines pregenerated per FMS vector (python -m agents.core.outline_templates); when one
+    # exists the flow skips week_outline_crew and only personalizes it to the coach notes
+    OUTLINE_TEMPLATES_ENABLED: bool = Field(True, env="OUTLINE_TEMPLATES_ENABLED")
+    OUTLINE_TEMPLATE_DB_PATH: str = Field(".data/outline_templates.sqlite3", env="OUTLINE_TEMPLATE_DB_PATH")
+    OUTLINE_PERSONALIZATION_MODEL: str = Field("groq/llama-3.1-8b-instant", env="OUTLINE_PERSONALIZATION_MODEL")
+
+    # Batch program generation (one roster per request or CLI run)
+    BATCH_MAX_CLIENTS: int = Field(500, env="BATCH_MAX_CLIENTS")
+    BATCH_MAX_CONCURRENCY: int = Field(2, env="BATCH_MAX_CONCURRENCY")
+    BATCH_EXPORT_DIR: str = Field(".data/batches", env="BATCH_EXPORT_DIR")
+    BATCH_EXPORT_TTL: float = Field(24 * 60 * 60, env="BATCH_EXPORT_TTL")
+
+    # Admission control: runs started inline by requests, beyond which requests get a 429
+    RUN_MAX_ACTIVE: int = Field(4, env="RUN_MAX_ACTIVE")
+    RUN_MAX_QUEUED: int = Field(16, env="RUN_MAX_QUEUED")
+
+    # LLM scheduler: per-provider budgets (keys: requests_per_minute, tokens_per_minute, max_concurrency)
+    LLM_PROVIDER_BUDGETS: Dict[str, Dict[str, Optional[int]]] = Field(
+        {
+            "openai": {"requests_per_minute": 500, "tokens_per_minute": 30000, "max_concurrency": 8},
+            "groq": {"requests_per_minute": 30, "tokens_per_minute": 6000, "max_concurrency": 4},
+        },
+        env="LLM_PROVIDER_BUDGETS",
+    )
+    LLM_DEFAULT_BUDGET: Dict[str, Optional[int]] = Field({"max_concurrency": 4}, env="LLM_DEFAULT_BUDGET")
+    LLM_COMPLETION_TOKEN_ESTIMATE: int = Field(1024, env="LLM_COMPLETION_TOKEN_ESTIMATE")
+    # Threads crews run in; they block there while their LLM calls wait on the scheduler
+    CREW_MAX_THREADS: int = Field(16, env="CREW_MAX_THREADS")
+
+    # Background jobs
+    JOB_DB_PATH: str = Field(".data/jobs.sqlite3", env="JOB_DB_PATH")
+    JOB_WORKERS: int = Field(2, env="JOB_WORKERS")
+    JOB_MAX_QUEUED: int = Field(100, env="JOB_MAX_QUEUED")
+    JOB_RESULT_TTL: float = Field(7 * 24 * 60 * 60, env="JOB_RESULT_TTL")
+    # Running jobs whose worker stops renewing this lease (seconds) are taken over by another worker
+    JOB_LEASE_SECONDS: float = Field(60.0, env="JOB_LEASE_SECONDS")
+    JOB_POLL_INTERVAL: float = Field(1.0, env="JOB_POLL_INTERVAL")
+
+    # Flow checkpoints: step results kept per run ID so a failed run can be resumed
+    CHECKPOINT_DB_PATH: str = Field(".data/checkpoints.sqlite3", env="CHECKPOINT_DB_PATH")
+    CHECKPOINT_TTL: float = Field(7 * 24 * 60 * 60, env="CHECKPOINT_TTL")
+
+    # Server-sent events
+    SSE_HEARTBEAT_INTERVAL: float = Field(15.0, env="SSE_HEARTBEAT_INTERVAL")
+
+    # Caching
+    CACHE_DIR: str = Field(".cache", env="CACHE_DIR")
+    PROGRAM_CACHE_TTL: float = Field(7 * 24 * 60 * 60, env="PROGRAM_CACHE_TTL")
+    PROGRAM_CACHE_MEMORY_ENTRIES: int = Field(128, env="PROGRAM_CACHE_MEMORY_ENTRIES")
+    PROGRAM_CACHE_MAX_BYTES: int = Field(256 * 1024 * 1024, env="PROGRAM_CACHE_MAX_BYTES")
+    STAGE_CACHE_TTL: float = Field(30 * 24 * 60 * 60, env="STAGE_CACHE_TTL")
+    STAGE_CACHE_MEMORY_ENTRIES: int = Field(512, env="STAGE_CACHE_MEMORY_ENTRIES")
+    STAGE_CACHE_MAX_BYTES: int = Field(512 * 1024 * 1024, env="STAGE_CACHE_MAX_BYTES")
+
+    @model_validator(mode="after")
+    def resolve_storage_paths(self) -> "Settings":
+        for name in STORAGE_PATH_SETTINGS:
+            setattr(self, name, str(Path(self.DATA_ROOT) / getattr(self, name)))
+        return self
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from crewai import Crew
+from pydantic import BaseModel
+
+from agents.core.cache import BaseCache, canonical_hash, file_fingerprint
+from agents.core.concurrency import kickoff_crew
+
+logger = logging.getLogger(__name__)
+
+class StageOutput(BaseModel):
+    """The parts of a CrewOutput the flows use, in a form that can be cached."""
+    raw: str
+    pydantic: Optional[Any] = None
+    tasks_raw: List[str] = []
+
+class CachedCrew:
+    """
+    Memoizes a crew's kickoff on a hash of its inputs and the files that define it: the crew
+    module (which picks the models) and its YAML configs. The crew itself is only fetched on a
+    cache miss, and every run kicks off a copy so concurrent calls don't share task state.
+    Concurrent calls with the same key share one kickoff instead of each running the crew.
+    """
+
+    def __init__(self, name: str, get_crew: Callable[[], Crew], crew_dir: str | Path, cache: BaseCache, output_model: Type[BaseModel] = None):
+        self.name = name
+        self.get_crew = get_crew
+        self.source_paths = sorted([*Path(crew_dir).glob("*.py"), *Path(crew_dir).glob("config/*.yaml")])
+        self.cache = cache
+        self.output_model = output_model
+        # Kickoffs in progress by cache key; later callers with the same key await the same one
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    def cache_key(self, inputs: Dict[str, Any]) -> str:
+        return canonical_hash(self.name, inputs, file_fingerprint(self.source_paths))
+
+    async def kickoff_async(self, inputs: Dict[str, Any], refresh: bool = False) -> StageOutput:
+        key = self.cache_key(inputs)
+        if not refresh:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                logger.info("%s cache hit: %s", self.name, key)
+                output = StageOutput.model_validate(cached)
+                if self.output_model and output.pydantic is not None:
+                    output.pydantic = self.output_model.model_validate(output.pydantic)
+                return output
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._kickoff(key, inputs))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            logger.info("%s joining in-flight run: %s", self.name, key)
+        # Shielded so one caller timing out or being cancelled doesn't cancel the run for the others
+        output = await asyncio.shield(task)
+        return output.model_copy(deep=True)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        # Every caller may have given up already; retrieve the error so it isn't reported as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    async def _kickoff(self, key: str, inputs: Dict[str, Any]) -> StageOutput:
+        result = await kickoff_crew(self.get_crew().copy(), inputs)
+        output = StageOutput(
+            raw=result.raw,
+            pydantic=result.pydantic,
+            tasks_raw=[task_output.raw for task_output in result.tasks_output],
+        )
+        await asyncio.to_thread(self.cache.set, key, output.model_dump(mode="json"))
+        return output
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from prisma import Prisma
+
+from agents.core.config import settings
+
+T = TypeVar("T")
+
+def pooled_url(url: str, connection_limit: int, pool_timeout: float) -> str:
+    """The database URL with the query engine's pool settings, unless the URL already sets them."""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.setdefault("connection_limit", str(connection_limit))
+    query.setdefault("pool_timeout", str(int(pool_timeout)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+class Database:
+    """
+    One Prisma client (and so one query engine and connection pool) for the
+    app's lifetime. Connected in the FastAPI lifespan and handed to services
+    through `get_prisma`; a dropped connection is re-established on the next
+    request or health check instead of per query.
+    """
+
+    def __init__(self, url: str, connection_limit: int, pool_timeout: float, connect_timeout: float):
+        self.url = pooled_url(url, connection_limit, pool_timeout)
+        self.connection_limit = connection_limit
+        self.connect_timeout = connect_timeout
+        self.client: Optional[Prisma] = None
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+        # The loop the client was connected on; its connections can only be used from there
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self.client is not None and self.client.is_connected()
+
+    async def connect(self) -> Prisma:
+        async with self._lock:
+            if self.connected:
+                return self.client
+            return await self._open()
+
+    async def disconnect(self) -> None:
+        async with self._lock:
+            if self.connected:
+                await self.client.disconnect()
+
+    async def reconnect(self) -> Prisma:
+        """Replace the client, e.g. after its query engine stopped answering."""
+        async with self._lock:
+            if self.connected:
+                try:
+                    await self.client.disconnect()
+                except Exception:
+                    pass
+            return await self._open()
+
+    async def _open(self) -> Prisma:
+        if self.client is not None:
+            self.reconnects += 1
+        self.client = Prisma(datasource={"url": self.url}, connect_timeout=timedelta(seconds=self.connect_timeout))
+        self.loop = asyncio.get_running_loop()
+        try:
+            await self.client.connect()
+        except Exception as e:
+            self.last_error = repr(e)
+            raise
+        self.last_error = None
+        return self.client
+
+    async def ensure_connected(self) -> Prisma:
+        return self.client if self.connected else await self.connect()
+
+    def run_from_thread(self, query: Callable[[Prisma], Awaitable[T]], timeout: float) -> T:
+        """
+        Run `query(client)` on the client's event loop from a worker thread (e.g. a crew
+        tool) and wait for the result. Raises RuntimeError if the app hasn't connected.
+        """
+        loop = self.loop
+        if loop is None or not loop.is_running():
+            raise RuntimeError("The database client isn't running in this process")
+        try:
+            in_loop_thread = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            in_loop_thread = False
+        if in_loop_thread:
+            # Blocking here would deadlock the loop the query needs
+            raise RuntimeError("run_from_thread called on the event loop thread; await the query instead")
+
+        async def run() -> T:
+            return await query(await self.ensure_connected())
+
+        return asyncio.run_coroutine_threadsafe(run(), loop).result(timeout)
+
+    async def health(self) -> Dict[str, Any]:
+        """Round-trip a trivial query, reconnecting once if it fails."""
+        start_time = time.perf_counter()
+        try:
+            client = await self.ensure_connected()
+            try:
+                await client.query_raw("SELECT 1")
+            except Exception:
+                client = await self.reconnect()
+                await client.query_raw("SELECT 1")
+        except Exception as e:
+            self.last_error = repr(e)
+            return {"status": "down", "error": self.last_error, "reconnects": self.reconnects}
+        return {
+            "status": "ok",
+            "latency_ms": round((time.perf_counter() - start_time) * 1000, 1),
+            "reconnects": self.reconnects,
+            "pool": await self.pool_metrics(),
+        }
+
+    async def pool_metrics(self) -> Dict[str, float]:
+        """Pool gauges and counters from the query engine (open/busy/idle connections, waiting queries, totals)."""
+        if not self.connected:
+            return {}
+        try:
+            metrics = await self.client.get_metrics()
+        except Exception:
+            # Metrics need the "metrics" preview feature in the generated client
+            return {}
+        values = {metric.key: metric.value for metric in [*metrics.gauges, *metrics.counters]}
+        values["connection_limit"] = self.connection_limit
+        return values
+
+database = Database(
+    settings.DATABASE_URL,
+    connection_limit=settings.DATABASE_POOL_SIZE,
+    pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+    connect_timeout=settings.DATABASE_CONNECT_TIMEOUT,
+)
+
+async def get_prisma() -> Prisma:
+    """FastAPI dependency: the shared, connected Prisma client."""
+    return await database.ensure_connected()
@@ -0,0 +1,325 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from enum import Enum
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from agents.core.admission import AdmissionRejected
+from agents.core.cache import to_json
+from agents.core.config import settings
+from agents.core.storage import connect_sqlite
+from agents.listeners.custom_listener import event_channels
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+FINISHED_STATUSES = {JobStatus.succeeded, JobStatus.failed}
+# Published on the job's event channel when it ends, so SSE streams know to stop
+JOB_TERMINAL_EVENTS = ["job_succeeded", "job_failed"]
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    status: JobStatus
+    params: Dict[str, Any]
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+class JobStore:
+    """
+    Jobs and their results in a SQLite file, so finished results outlive the worker process.
+    The table is also the queue shared by every process using the file: a worker claims a job
+    by taking a lease on it and renews the lease while the job runs, so only jobs whose owner
+    stopped renewing (it crashed or was killed) are claimed again.
+    """
+
+    def __init__(self, path: str | Path):
+        self._lock = threading.Lock()
+        self._db = connect_sqlite(path)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                owner TEXT,
+                lease_until REAL
+            )
+            """
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        for column, definition in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                # Job files from before leases existed
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+
+    def create(self, kind: str, params: Dict[str, Any]) -> Job:
+        job = Job(id=uuid.uuid4().hex, kind=kind, status=JobStatus.queued, params=json.loads(to_json(params)), created_at=time.time())
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, status, params, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.kind, job.status.value, to_json(job.params), job.created_at),
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, kind, status, params, result, error, created_at, started_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        return self._to_job(row) if row else None
+
+    def count_queued(self) -> int:
+        """Jobs waiting for a worker in any process."""
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (JobStatus.queued.value,)).fetchone()
+        return count
+
+    def claim(self, owner: str, lease: float) -> Optional[Job]:
+        """
+        Take the oldest queued job, or a running one whose lease has expired, for `owner`.
+        A single UPDATE, so two processes can never claim the same job.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "UPDATE jobs SET status = ?, owner = ?, lease_until = ?, started_at = ? WHERE id = ("
+                "SELECT id FROM jobs WHERE status = ? OR (status = ? AND (lease_until IS NULL OR lease_until < ?)) "
+                "ORDER BY created_at LIMIT 1"
+                ") RETURNING id, kind, status, params, result, error, created_at, started_at, finished_at",
+                (JobStatus.running.value, owner, now + lease, now, JobStatus.queued.value, JobStatus.running.value, now),
+            ).fetchone()
+        return self._to_job(row) if row else None
+
+    def renew(self, job_id: str, owner: str, lease: float) -> bool:
+        """Extend `owner`'s lease on a running job; False if it no longer holds it."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND owner = ? AND status = ?",
+                (time.time() + lease, job_id, owner, JobStatus.running.value),
+            )
+        return cursor.rowcount == 1
+
+    def release(self, job_id: str, owner: str) -> None:
+        """Put a job `owner` is giving up (e.g. on shutdown) back in the queue for any worker."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, lease_until = NULL, started_at = NULL WHERE id = ? AND owner = ? AND status = ?",
+                (JobStatus.queued.value, job_id, owner, JobStatus.running.value),
+            )
+
+    def mark_succeeded(self, job_id: str, owner: str, result: Any) -> bool:
+        """Store a running job's result; False (and nothing stored) if `owner` no longer holds it."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, finished_at = ?, lease_until = NULL WHERE id = ? AND owner = ? AND status = ?",
+                (JobStatus.succeeded.value, to_json(result), time.time(), job_id, owner, JobStatus.running.value),
+            )
+        return cursor.rowcount == 1
+
+    def mark_failed(self, job_id: str, owner: str, error: str) -> bool:
+        """Record a running job's failure; False (and nothing stored) if `owner` no longer holds it."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_until = NULL WHERE id = ? AND owner = ? AND status = ?",
+                (JobStatus.failed.value, error, time.time(), job_id, owner, JobStatus.running.value),
+            )
+        return cursor.rowcount == 1
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs that ended more than `older_than` seconds ago."""
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (JobStatus.succeeded.value, JobStatus.failed.value, time.time() - older_than),
+            )
+        return cursor.rowcount
+
+    def params_of_kind(self, kind: str) -> List[Dict[str, Any]]:
+        """The params of every stored job of one kind, e.g. to see which inputs are common."""
+        with self._lock:
+            rows = self._db.execute("SELECT params FROM jobs WHERE kind = ?", (kind,)).fetchall()
+        return [json.loads(params) for (params,) in rows]
+
+    @staticmethod
+    def _to_job(row) -> Job:
+        id, kind, status, params, result, error, created_at, started_at, finished_at = row
+        return Job(
+            id=id,
+            kind=kind,
+            status=JobStatus(status),
+            params=json.loads(params),
+            result=json.loads(result) if result is not None else None,
+            error=error,
+            created_at=created_at,
+            started_at=started_at,
+            finished_at=finished_at,
+        )
+
+class JobManager:
+    """
+    Runs jobs from the job store on a fixed number of asyncio workers per process.
+    Each job runs bound to an event channel named after its ID, so `/jobs/{id}/events`
+    streams exactly that job's flow/crew events. Workers claim jobs through the store, so
+    several processes can share one job file; jobs a crashed process was running are
+    picked up once their lease expires.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int,
+        result_ttl: Optional[float] = None,
+        max_queued: Optional[int] = None,
+        lease: float = 60.0,
+        poll_interval: float = 1.0,
+    ):
+        self.store = store
+        self.workers = workers
+        # Submissions past this many waiting jobs (across every process) are rejected (429) instead of queued
+        self.max_queued = max_queued
+        self._avg_job_seconds = 60.0
+        # Finished jobs (and their results) are deleted this many seconds after they end
+        self.result_ttl = result_ttl
+        # A running job's lease is renewed every third of this; a job whose lease lapses is reclaimed
+        self.lease = lease
+        # Idle workers check the store this often for jobs submitted by other processes
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, JobHandler] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    async def start(self) -> None:
+        if self.result_ttl is not None:
+            self.store.purge(self.result_ttl)
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Job:
+        if kind not in self._handlers:
+            raise KeyError(f"No job handler registered for '{kind}'")
+        if self._wake is None:
+            raise RuntimeError("Job workers are not running")
+        if self.max_queued is not None:
+            queued = self.store.count_queued()
+            if queued >= self.max_queued:
+                raise AdmissionRejected(
+                    f"Job queue is full ({queued} waiting)",
+                    self._avg_job_seconds * (queued + 1) / self.workers,
+                )
+        job = self.store.create(kind, params)
+        self._wake.set()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = self.store.claim(self.owner, self.lease)
+            if job is None:
+                # Woken right away by submissions here; jobs from other processes are found by polling
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            start_time = time.monotonic()
+            try:
+                await self._run(job)
+            finally:
+                self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * (time.monotonic() - start_time)
+
+    async def _keep_lease(self, job_id: str, work: asyncio.Task) -> None:
+        """Renew the lease while `work` runs; once it's lost, stop the work, since another worker now owns the job."""
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            if not self.store.renew(job_id, self.owner, self.lease):
+                logger.warning("Lost the lease on job %s; another worker may have reclaimed it, stopping it here", job_id)
+                work.cancel()
+                return
+
+    async def _run(self, job: Job) -> None:
+        handler = self._handlers.get(job.kind)
+        with event_channels.bind(job.id):
+            event_channels.publish(job.id, {"type": "job_started", "job_id": job.id, "timestamp": time.time()})
+            if handler is None:
+                self._finish(job, error=repr(KeyError(f"No job handler registered for '{job.kind}'")))
+                return
+            work = asyncio.create_task(handler(job.params))
+            heartbeat = asyncio.create_task(self._keep_lease(job.id, work))
+            try:
+                result = await work
+            except asyncio.CancelledError:
+                if heartbeat.done():
+                    # Cancelled by _keep_lease: the job is someone else's now, and this worker carries on
+                    return
+                # Shutting down: hand the job back so a running worker (or the next start) resumes it
+                self.store.release(job.id, self.owner)
+                raise
+            except Exception as e:
+                logger.exception("Job %s failed", job.id)
+                self._finish(job, error=repr(e))
+                return
+            finally:
+                heartbeat.cancel()
+            self._finish(job, result=result)
+
+    def _finish(self, job: Job, result: Any = None, error: Optional[str] = None) -> None:
+        """Store the outcome and announce it, unless the lease was lost meanwhile and the new owner will."""
+        if error is not None:
+            stored = self.store.mark_failed(job.id, self.owner, error)
+            event = {"type": "job_failed", "job_id": job.id, "error": error, "timestamp": time.time()}
+        else:
+            stored = self.store.mark_succeeded(job.id, self.owner, result)
+            event = {"type": "job_succeeded", "job_id": job.id, "timestamp": time.time()}
+        if not stored:
+            logger.warning("Job %s finished here after another worker took it over; dropping this outcome", job.id)
+            return
+        event_channels.publish(job.id, event)
+
+job_manager = JobManager(
+    JobStore(settings.JOB_DB_PATH),
+    workers=settings.JOB_WORKERS,
+    result_ttl=settings.JOB_RESULT_TTL,
+    max_queued=settings.JOB_MAX_QUEUED,
+    lease=settings.JOB_LEASE_SECONDS,
+    poll_interval=settings.JOB_POLL_INTERVAL,
+)
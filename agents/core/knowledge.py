@@ -0,0 +1,56 @@
+import hashlib
+import logging
+from pathlib import Path
+
+from crewai.knowledge.knowledge import Knowledge
+from crewai.knowledge.source.pdf_knowledge_source import PDFKnowledgeSource
+from crewai.knowledge.storage.knowledge_storage import KnowledgeStorage
+from crewai.utilities.constants import KNOWLEDGE_DIRECTORY
+
+from agents.core.registry import registry
+
+logger = logging.getLogger(__name__)
+
+# Resolved by crewai relative to the `knowledge/` directory
+CFSC_PDF = "CFSC_Regression:Progression_Sheet_2023.pdf"
+
+def content_hash(path: Path) -> str:
+    """sha256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def build_cfsc_pdf_source() -> PDFKnowledgeSource:
+    """The CFSC regression/progression sheet as a raw (unembedded) source."""
+    return PDFKnowledgeSource(file_paths=[CFSC_PDF])
+
+def build_cfsc_knowledge() -> Knowledge:
+    """
+    One embedded index of the CFSC sheet, shared by every agent that searches it.
+
+    Agents given `knowledge_sources` re-chunk and re-embed them into a
+    collection named after their role on every kickoff. Handing them this
+    `Knowledge` instead means the sheet is embedded once into a persistent
+    chroma collection named after the PDF's content hash; later processes
+    open the same collection and skip parsing and embedding entirely. Editing
+    the PDF changes the hash, so a fresh collection is built on next use.
+    """
+    pdf_hash = content_hash(Path(KNOWLEDGE_DIRECTORY) / CFSC_PDF)
+    storage = KnowledgeStorage(collection_name=f"cfsc_{pdf_hash[:16]}")
+    knowledge = Knowledge(
+        collection_name=storage.collection_name,
+        sources=[],
+        storage=storage,
+    )
+    if storage.collection is not None and storage.collection.count() > 0:
+        logger.info("Reusing embedded CFSC index %s", storage.collection_name)
+        return knowledge
+
+    logger.info("Embedding CFSC sheet into %s", storage.collection_name)
+    knowledge.sources = [build_cfsc_pdf_source()]
+    knowledge.add_sources()
+    return knowledge
+
+registry.register("cfsc_knowledge", build_cfsc_knowledge)
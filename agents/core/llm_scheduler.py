@@ -0,0 +1,271 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+
+import litellm
+from crewai import LLM
+from pydantic import BaseModel
+
+from agents.core.config import settings
+from agents.listeners.custom_listener import DEFAULT_RUN_ID, current_run_id
+
+WINDOW_SECONDS = 60.0
+# How long a waiter sleeps before re-checking budgets if nothing wakes it sooner
+MAX_WAIT_SLICE = 1.0
+
+class ProviderBudget(BaseModel):
+    """Per-provider limits. None means unlimited."""
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    max_concurrency: int = 4
+
+class _Waiter:
+    def __init__(self, run_id: str, tokens: int, wake: Callable[[], None]):
+        self.run_id = run_id
+        self.tokens = tokens
+        self.wake = wake
+        self.granted = False
+
+class _ProviderState:
+    def __init__(self, budget: ProviderBudget):
+        self.budget = budget
+        self.in_flight = 0
+        # (granted_at, tokens) for calls started within the last minute
+        self.window: Deque[tuple[float, int]] = deque()
+        self.window_tokens = 0
+        # Waiting calls per run, in the order runs take turns; each run's calls stay FIFO
+        self.waiters: Dict[str, Deque[_Waiter]] = {}
+        self.queued = 0
+
+    def next_waiter(self) -> Optional[_Waiter]:
+        """The call at the head of the run whose turn it is."""
+        for queue in self.waiters.values():
+            return queue[0]
+        return None
+
+    def add_waiter(self, waiter: _Waiter) -> None:
+        self.waiters.setdefault(waiter.run_id, deque()).append(waiter)
+        self.queued += 1
+
+    def pop_waiter(self) -> _Waiter:
+        """Take the next run's head call and send that run to the back of the rotation."""
+        run_id, queue = next(iter(self.waiters.items()))
+        waiter = queue.popleft()
+        del self.waiters[run_id]
+        if queue:
+            self.waiters[run_id] = queue
+        self.queued -= 1
+        return waiter
+
+    def remove_waiter(self, waiter: _Waiter) -> bool:
+        queue = self.waiters.get(waiter.run_id)
+        if queue is None or waiter not in queue:
+            return False
+        queue.remove(waiter)
+        if not queue:
+            del self.waiters[waiter.run_id]
+        self.queued -= 1
+        return True
+
+    def trim(self, now: float) -> None:
+        while self.window and self.window[0][0] <= now - WINDOW_SECONDS:
+            self.window_tokens -= self.window.popleft()[1]
+
+    def can_start(self, tokens: int, now: float) -> bool:
+        self.trim(now)
+        budget = self.budget
+        if self.in_flight >= budget.max_concurrency:
+            return False
+        if budget.requests_per_minute is not None and len(self.window) >= budget.requests_per_minute:
+            return False
+        # A single call bigger than the whole budget still runs, alone, once the window is empty
+        if budget.tokens_per_minute is not None and self.window and self.window_tokens + tokens > budget.tokens_per_minute:
+            return False
+        return True
+
+    def start(self, tokens: int, now: float) -> None:
+        self.in_flight += 1
+        self.window.append((now, tokens))
+        self.window_tokens += tokens
+
+class LLMScheduler:
+    """
+    Central gate for LLM calls from crews, flows and endpoints, shared across threads
+    (crews call their LLMs from worker threads) and the event loop.
+
+    Each provider gets a concurrency cap and sliding one-minute request and token
+    budgets. Calls that don't fit wait per provider, grouped by the run they belong to
+    (current_run_id); runs take turns round-robin and each run's calls go in arrival
+    order, so one large run can't starve the rest. Calls are never refused here: by the
+    time a call is made its run was admitted (run_admission), and failing the call would
+    fail the run part way. Token cost is estimated up front from the prompt plus
+    `completion_tokens` for the reply.
+    """
+
+    def __init__(
+        self,
+        budgets: Dict[str, ProviderBudget],
+        default_budget: ProviderBudget,
+        completion_tokens: int = 1024,
+    ):
+        self.budgets = budgets
+        self.default_budget = default_budget
+        self.completion_tokens = completion_tokens
+        self._providers: Dict[str, _ProviderState] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def provider_for(model: str) -> str:
+        try:
+            return litellm.get_llm_provider(model)[1]
+        except Exception:
+            return model.split("/", 1)[0] if "/" in model else "unknown"
+
+    def estimate_tokens(self, model: str, messages: Any) -> int:
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        try:
+            prompt_tokens = litellm.token_counter(model=model, messages=messages)
+        except Exception:
+            prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+        return prompt_tokens + self.completion_tokens
+
+    @contextmanager
+    def slot(self, model: str, tokens: int):
+        """
+        Block the calling thread until the call fits the provider's budgets. Crews call
+        this from their own threads (see kickoff_crew), never from the event loop.
+        """
+        state = self._state(model)
+        event = threading.Event()
+        waiter = self._enqueue(state, tokens, event.set)
+        try:
+            while not waiter.granted:
+                event.wait(self._wait_time(state))
+                event.clear()
+                self._dispatch(state)
+        except BaseException:
+            self._abandon(state, waiter)
+            raise
+        try:
+            yield
+        finally:
+            self._release(state)
+
+    @asynccontextmanager
+    async def aslot(self, model: str, tokens: int):
+        """Async version of slot(); waits on the event loop instead of blocking a thread."""
+        state = self._state(model)
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+        waiter = self._enqueue(state, tokens, lambda: loop.call_soon_threadsafe(wakeup.set))
+        try:
+            while not waiter.granted:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), self._wait_time(state))
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()
+                self._dispatch(state)
+        except BaseException:
+            self._abandon(state, waiter)
+            raise
+        try:
+            yield
+        finally:
+            self._release(state)
+
+    def completion(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> Any:
+        """litellm.completion within the provider's budgets."""
+        with self.slot(model, self.estimate_tokens(model, messages)):
+            return litellm.completion(model=model, messages=messages, **kwargs)
+
+    async def acompletion(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> Any:
+        """litellm.acompletion within the provider's budgets."""
+        async with self.aslot(model, self.estimate_tokens(model, messages)):
+            return await litellm.acompletion(model=model, messages=messages, **kwargs)
+
+    async def astream(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> AsyncIterator[str]:
+        """Stream the reply's text as it's generated; the slot is held until the stream ends."""
+        async with self.aslot(model, self.estimate_tokens(model, messages)):
+            response = await litellm.acompletion(model=model, messages=messages, stream=True, **kwargs)
+            async for chunk in response:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    yield content
+
+    def status(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                provider: {
+                    "in_flight": state.in_flight,
+                    "queued": state.queued,
+                    "queued_runs": len(state.waiters),
+                    "requests_last_minute": len(state.window),
+                }
+                for provider, state in self._providers.items()
+            }
+
+    def _state(self, model: str) -> _ProviderState:
+        provider = self.provider_for(model)
+        with self._lock:
+            state = self._providers.get(provider)
+            if state is None:
+                state = self._providers[provider] = _ProviderState(self.budgets.get(provider, self.default_budget))
+            return state
+
+    def _enqueue(self, state: _ProviderState, tokens: int, wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(current_run_id.get() or DEFAULT_RUN_ID, tokens, wake)
+        with self._lock:
+            now = time.monotonic()
+            if not state.queued and state.can_start(tokens, now):
+                state.start(tokens, now)
+                waiter.granted = True
+                return waiter
+            state.add_waiter(waiter)
+        return waiter
+
+    def _dispatch(self, state: _ProviderState) -> None:
+        """Grant queued calls, one run at a time in turn, while the next one fits."""
+        with self._lock:
+            now = time.monotonic()
+            while state.queued and state.can_start(state.next_waiter().tokens, now):
+                waiter = state.pop_waiter()
+                state.start(waiter.tokens, now)
+                waiter.granted = True
+                waiter.wake()
+
+    def _release(self, state: _ProviderState) -> None:
+        with self._lock:
+            state.in_flight -= 1
+        self._dispatch(state)
+
+    def _abandon(self, state: _ProviderState, waiter: _Waiter) -> None:
+        with self._lock:
+            if state.remove_waiter(waiter):
+                return
+        if waiter.granted:
+            self._release(state)
+
+    def _wait_time(self, state: _ProviderState) -> float:
+        # Sleep until the oldest call leaves the window, but re-check at least every MAX_WAIT_SLICE
+        with self._lock:
+            if not state.window:
+                return MAX_WAIT_SLICE
+            return min(MAX_WAIT_SLICE, max(0.01, state.window[0][0] + WINDOW_SECONDS - time.monotonic()))
+
+class ScheduledLLM(LLM):
+    """crewai LLM whose calls go through the shared scheduler; use it in place of LLM(...) or llm="model"."""
+
+    def call(self, messages, *args, **kwargs):
+        with llm_scheduler.slot(self.model, llm_scheduler.estimate_tokens(self.model, messages)):
+            return super().call(messages, *args, **kwargs)
+
+llm_scheduler = LLMScheduler(
+    budgets={provider: ProviderBudget(**budget) for provider, budget in settings.LLM_PROVIDER_BUDGETS.items()},
+    default_budget=ProviderBudget(**settings.LLM_DEFAULT_BUDGET),
+    completion_tokens=settings.LLM_COMPLETION_TOKEN_ESTIMATE,
+)
@@ -0,0 +1,227 @@
+"""
+Week outlines pregenerated for FMS vectors, so the common case skips week_outline_crew
+(an FMS analysis agent followed by the outline agent) at request time.
+
+The FMS space is small: seven tests scored 1-3 is 3**7 = 2187 vectors, and programs
+always have the same number of days. Templates are generated offline with a neutral
+fitness history and stored in SQLite along with the fingerprint of the crew's files,
+so editing the crew's prompts or models makes old templates miss. At request time
+the template's prep, power and finisher are adjusted to the coach notes with one
+small-model call; the exercise groups are kept as generated.
+
+    python -m agents.core.outline_templates --top 200    # the most requested vectors
+    python -m agents.core.outline_templates --all        # every vector
+"""
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from itertools import product
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from agents.core.cache import canonical_hash, file_fingerprint, to_json
+from agents.core.config import settings
+from agents.core.llm_scheduler import llm_scheduler
+from agents.core.storage import connect_sqlite
+from agents.models.program import WeekOutline
+
+logger = logging.getLogger(__name__)
+
+FMS_TESTS = (
+    "deep_squat",
+    "hurdle_step",
+    "inline_lunge",
+    "shoulder_mobility",
+    "active_straight_leg_raise",
+    "trunk_stability_pushup",
+    "rotary_stability",
+)
+FmsVector = Tuple[int, ...]
+
+# Templates are generated without client details; personalization adds them back
+TEMPLATE_FITNESS_HISTORY = "No fitness history provided."
+WEEK_OUTLINE_CREW_DIR = Path(__file__).resolve().parent.parent / "flows" / "generate_program_flow" / "crews" / "week_outline_crew"
+WEEK_OUTLINE_SOURCE_PATHS = sorted([*WEEK_OUTLINE_CREW_DIR.glob("*.py"), *WEEK_OUTLINE_CREW_DIR.glob("config/*.yaml")])
+
+class OutlineTemplate(BaseModel):
+    fms_analysis: str
+    week_outline: WeekOutline
+
+class DayPersonalization(BaseModel):
+    day: str
+    prep: str
+    power: str
+    finisher: str
+
+class OutlinePersonalization(BaseModel):
+    rationale: str = Field(..., description="The week outline's rationale, rewritten for the client's fitness history")
+    days: List[DayPersonalization]
+
+def fms_vector(fms: Dict[str, Any]) -> FmsVector:
+    return tuple(int(fms[test]) for test in FMS_TESTS)
+
+def fms_from_vector(vector: FmsVector) -> Dict[str, int]:
+    fms = dict(zip(FMS_TESTS, vector))
+    fms["total_score"] = sum(vector)
+    return fms
+
+def all_fms_vectors() -> List[FmsVector]:
+    return list(product((1, 2, 3), repeat=len(FMS_TESTS)))
+
+def frequent_fms_vectors(top: int) -> List[FmsVector]:
+    """The `top` FMS vectors most often seen in stored program jobs."""
+    from agents.core.jobs import job_manager
+    counts = Counter(
+        fms_vector(params["fms"])
+        for params in job_manager.store.params_of_kind("program_flow")
+        if params.get("fms")
+    )
+    return [vector for vector, _ in counts.most_common(top)]
+
+def template_fingerprint() -> str:
+    return canonical_hash(file_fingerprint(WEEK_OUTLINE_SOURCE_PATHS), TEMPLATE_FITNESS_HISTORY)
+
+class OutlineTemplateStore:
+    """Templates keyed on FMS vector and day count; only those made with the current crew files are returned."""
+
+    def __init__(self, path: str | Path):
+        self._lock = threading.Lock()
+        self._db = connect_sqlite(path)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outline_templates (
+                fms TEXT NOT NULL,
+                days INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL,
+                fms_analysis TEXT NOT NULL,
+                week_outline TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (fms, days)
+            )
+            """
+        )
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def fingerprint(self) -> str:
+        # Hashing the crew files once per process is enough; they only change on deploy
+        if self._fingerprint is None:
+            self._fingerprint = template_fingerprint()
+        return self._fingerprint
+
+    def get(self, fms: Dict[str, Any], days: int) -> Optional[OutlineTemplate]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fms_analysis, week_outline FROM outline_templates WHERE fms = ? AND days = ? AND fingerprint = ?",
+                (to_json(fms_vector(fms)), days, self.fingerprint),
+            ).fetchone()
+        if row is None:
+            return None
+        fms_analysis, week_outline = row
+        return OutlineTemplate(fms_analysis=fms_analysis, week_outline=WeekOutline.model_validate_json(week_outline))
+
+    def put(self, fms: Dict[str, Any], days: int, template: OutlineTemplate) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO outline_templates (fms, days, fingerprint, fms_analysis, week_outline, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (to_json(fms_vector(fms)), days, self.fingerprint, template.fms_analysis, template.week_outline.model_dump_json(), time.time()),
+            )
+
+    def count(self) -> int:
+        """Templates usable with the current crew files."""
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM outline_templates WHERE fingerprint = ?", (self.fingerprint,)).fetchone()
+        return count
+
+def personalization_messages(week_outline: WeekOutline, coach_notes: str) -> List[dict]:
+    days = [day.model_dump(include={"day", "prep", "power", "finisher"}) for day in week_outline.days]
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are a personal trainer adapting a week of workouts that was planned from a client's Functional "
+                "Movement Screen. Adjust only the movement prep, power and finisher of each day so they suit the "
+                "client's fitness history, avoiding anything that could aggravate an injury or pain. Keep a day "
+                "unchanged when it already suits the client. Reply with JSON only."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"Client fitness history: {coach_notes}\n\n"
+                f"Current rationale: {week_outline.rationale}\n\n"
+                f"Days: {json.dumps(days)}\n\n"
+                'Return {"rationale": "<rationale for this client>", "days": [{"day", "prep", "power", "finisher"} for every day]}.'
+            ),
+        },
+    ]
+
+async def personalize_outline(week_outline: WeekOutline, coach_notes: Optional[str], model: str = settings.OUTLINE_PERSONALIZATION_MODEL) -> WeekOutline:
+    """
+    Fit a template's prep, power, finisher and rationale to the coach notes.
+    Any failure keeps the template as it is; it's still a valid outline for the FMS.
+    """
+    if not coach_notes or not coach_notes.strip():
+        return week_outline
+    try:
+        response = await llm_scheduler.acompletion(
+            model=model,
+            messages=personalization_messages(week_outline, coach_notes),
+            response_format={"type": "json_object"},
+        )
+        personalization = OutlinePersonalization.model_validate_json(response.choices[0].message.content)
+    except Exception as e:
+        logger.warning("Outline personalization failed, using the template as is: %r", e)
+        return week_outline
+    changes = {day.day: day for day in personalization.days}
+    days = [
+        day.model_copy(update=changes[day.day].model_dump(include={"prep", "power", "finisher"})) if day.day in changes else day
+        for day in week_outline.days
+    ]
+    return week_outline.model_copy(update={"rationale": personalization.rationale, "days": days})
+
+outline_templates = OutlineTemplateStore(settings.OUTLINE_TEMPLATE_DB_PATH)
+
+async def generate_templates(vectors: List[FmsVector], days: int, concurrency: int, store: OutlineTemplateStore = outline_templates) -> int:
+    """Run week_outline_crew for every vector without a current template; returns how many were stored."""
+    from agents.core.concurrency import gather_bounded, kickoff_crew
+    from agents.core.registry import registry
+    import agents.flows.generate_program_flow.crews.week_outline_crew.week_outline_crew  # registers the crew
+
+    fms_list = [fms for fms in map(fms_from_vector, vectors) if store.get(fms, days) is None]
+    print(f"Generating {len(fms_list)} outline templates ({len(vectors) - len(fms_list)} already stored)")
+
+    async def generate(fms: Dict[str, int]) -> bool:
+        try:
+            result = await kickoff_crew(
+                registry.get("week_outline_crew").copy(),
+                {"fms": fms, "fitness_history": TEMPLATE_FITNESS_HISTORY, "days": days},
+            )
+            store.put(fms, days, OutlineTemplate(fms_analysis=result.tasks_output[0].raw, week_outline=result.pydantic))
+            return True
+        except Exception as e:
+            # One bad vector shouldn't stop the batch; rerunning picks it up again
+            print(f"Template for {fms_vector(fms)} failed: {e!r}")
+            return False
+
+    stored = await gather_bounded(fms_list, generate, concurrency)
+    return sum(stored)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pregenerate week outline templates per FMS vector")
+    selection = parser.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--all", action="store_true", help="Every FMS vector (3**7)")
+    selection.add_argument("--top", type=int, help="The N FMS vectors most often seen in program jobs")
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=settings.PROGRAM_FLOW_MAX_CONCURRENCY)
+    args = parser.parse_args()
+
+    vectors = all_fms_vectors() if args.all else frequent_fms_vectors(args.top)
+    stored = asyncio.run(generate_templates(vectors, args.days, args.concurrency))
+    print(f"Stored {stored} templates; {outline_templates.count()} current templates in {settings.OUTLINE_TEMPLATE_DB_PATH}")
@@ -0,0 +1,117 @@
+"""
+Plain-text digest of a compact program for LLM prompts.
+
+Week 1 is written out one line per exercise; later weeks list only what changed
+from week 1, one line per changed exercise. Output is deterministic for a given
+program. `fit_digest` drops detail (movement prep, then intermediate weeks, then
+trailing lines) until the digest fits a token budget measured with the model's
+own tokenizer.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+import litellm
+
+from agents.models.workout import CircuitDelta, CompactProgram, WeekDelta, WorkoutPlan
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_LABELS = {"circuit_1": "C1", "circuit_2": "C2"}
+TRUNCATED = "[... rest of the program omitted to fit the prompt budget]"
+
+def count_tokens(model: str, content: Any) -> int:
+    """Tokens in a string or a list of chat messages, by the model's tokenizer (rough estimate if unknown)."""
+    try:
+        if isinstance(content, str):
+            return litellm.token_counter(model=model, text=content)
+        return litellm.token_counter(model=model, messages=content)
+    except Exception:
+        text = content if isinstance(content, str) else "".join(str(message.get("content", "")) for message in content)
+        return len(text) // 4
+
+def _base_day_lines(plan: WorkoutPlan, include_prep: bool) -> List[str]:
+    lines = [f"W1 {plan.day} power: {plan.power}"]
+    if include_prep:
+        for prep in plan.movement_prep:
+            lines.append(
+                f"W1 {plan.day} prep: roll {', '.join(prep.foam_rolling)}; stretch {', '.join(prep.dynamic_stretches)}; "
+                f"activate {', '.join(prep.activation_exercises)}"
+            )
+    for field, label in CIRCUIT_LABELS.items():
+        circuit = getattr(plan, field)
+        for exercise in circuit.exercises:
+            lines.append(f"W1 {plan.day} {label} {circuit.rounds}x{circuit.rest}s: {exercise.name} {exercise.reps} reps RPE {exercise.rpe}")
+    lines.append(f"W1 {plan.day} finisher: {plan.finisher}")
+    return lines
+
+def _circuit_delta_lines(prefix: str, base: Any, delta: CircuitDelta) -> List[str]:
+    if delta.circuit is not None:
+        return [
+            f"{prefix} {delta.circuit.rounds}x{delta.circuit.rest}s: {exercise.name} {exercise.reps} reps RPE {exercise.rpe}"
+            for exercise in delta.circuit.exercises
+        ]
+    lines = []
+    if delta.rounds is not None or delta.rest is not None:
+        lines.append(f"{prefix} {delta.rounds or base.rounds}x{delta.rest or base.rest}s")
+    for change in delta.exercises:
+        exercise = base.exercises[change.index].model_copy(update=change.changes())
+        lines.append(f"{prefix}: {exercise.name} {exercise.reps} reps RPE {exercise.rpe}")
+    return lines
+
+def _week_lines(week: WeekDelta, base_days: Dict[str, WorkoutPlan], include_prep: bool) -> List[str]:
+    if not week.days:
+        return [f"W{week.week}: same as W1"]
+    lines = []
+    for delta in week.days:
+        base, prefix = base_days[delta.day], f"W{week.week} {delta.day}"
+        if delta.power is not None:
+            lines.append(f"{prefix} power: {delta.power}")
+        if include_prep and delta.movement_prep is not None:
+            lines.append(f"{prefix} prep changed")
+        for field, label in CIRCUIT_LABELS.items():
+            circuit_delta = getattr(delta, field)
+            if circuit_delta is not None:
+                lines.extend(_circuit_delta_lines(f"{prefix} {label}", getattr(base, field), circuit_delta))
+        if delta.finisher is not None:
+            lines.append(f"{prefix} finisher: {delta.finisher}")
+    return lines
+
+def program_digest_lines(program: CompactProgram, include_prep: bool = True, weeks: Optional[List[int]] = None) -> List[str]:
+    """Digest lines for week 1 and the given later weeks (all of them by default)."""
+    base_days = {plan.day: plan for plan in program.base_week}
+    lines = [f"{len(program.weeks) + 1} weeks, {len(program.base_week)} days/week. Later weeks list only changes from W1."]
+    for plan in program.base_week:
+        lines.extend(_base_day_lines(plan, include_prep))
+    for week in program.weeks:
+        if weeks is None or week.week in weeks:
+            lines.extend(_week_lines(week, base_days, include_prep))
+    return lines
+
+def program_digest(program: CompactProgram, include_prep: bool = True, weeks: Optional[List[int]] = None) -> str:
+    return "\n".join(program_digest_lines(program, include_prep, weeks))
+
+def fit_digest(program: CompactProgram, model: str, budget: int) -> str:
+    """The most detailed digest that fits in `budget` tokens."""
+    final_week = [program.weeks[-1].week] if program.weeks else []
+    candidates = [
+        program_digest_lines(program),
+        program_digest_lines(program, include_prep=False),
+        # Weeks are relative to W1, so the last one alone still shows where the program ends up
+        program_digest_lines(program, include_prep=False, weeks=final_week),
+    ]
+    for lines in candidates:
+        digest = "\n".join(lines)
+        if count_tokens(model, digest) <= budget:
+            return digest
+
+    # Still too big: keep whole lines from the top while they fit
+    kept: List[str] = []
+    used = count_tokens(model, TRUNCATED)
+    for line in candidates[-1]:
+        line_tokens = count_tokens(model, line + "\n")
+        if used + line_tokens > budget:
+            break
+        kept.append(line)
+        used += line_tokens
+    logger.warning("Program digest truncated to %d of %d lines to fit %d tokens", len(kept), len(candidates[-1]), budget)
+    return "\n".join([*kept, TRUNCATED])
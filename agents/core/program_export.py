@@ -0,0 +1,200 @@
+import io
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi.responses import StreamingResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+
+from agents.core.compact_program import program_weeks
+
+SECTION_HEADERS = {'Correctives/Movement Prep', 'Power/Speed/Agility Training', 'Resistance Training', 'Energy System Development'}
+COLUMN_HEADERS = {'Notes', 'Sets/Reps/Time', 'Load', 'Rest', 'Volume/Intensity/Rest'}
+# Headers that span their own column and the next one
+MERGED_HEADERS = SECTION_HEADERS | {'Volume/Intensity/Rest'}
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CHUNK_SIZE = 64 * 1024
+
+CELL_STYLE = "program_cell"
+HEADER_STYLE = "program_header"
+DAY_COLUMNS = 6
+
+def _as_dict(value: Any) -> Any:
+    # Weeks hold plain dicts (week 1) or pydantic models (progressions)
+    return value.model_dump() if hasattr(value, 'model_dump') else value
+
+def _add_named_styles(workbook: Workbook) -> None:
+    """Register the styles once per workbook; cells refer to them by name."""
+    thin = Side(style='thin')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    workbook.add_named_style(NamedStyle(name=CELL_STYLE, border=border))
+    workbook.add_named_style(NamedStyle(
+        name=HEADER_STYLE,
+        font=Font(bold=True),
+        fill=PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid"),
+        alignment=Alignment(horizontal='center', vertical='center'),
+        border=border,
+    ))
+
+class SheetRows:
+    """
+    A sheet's rows plus the widest value seen in each column. Write-only sheets
+    need their column widths before the first row goes out, so rows are
+    collected (with widths tracked as they're added) and then streamed once.
+    """
+
+    def __init__(self, max_width: int):
+        self.max_width = max_width
+        self.rows: List[List[Any]] = []
+        self.widths: Dict[int, int] = {}
+
+    def append(self, row: List[Any]) -> None:
+        for col_idx, value in enumerate(row, 1):
+            length = len(str(value)) if value not in (None, '') else 0
+            self.widths[col_idx] = max(self.widths.get(col_idx, 0), length)
+        self.rows.append(row)
+
+    def write(self, workbook: Workbook, title: str, styled: bool = False) -> None:
+        worksheet = workbook.create_sheet(title)
+        for col_idx, width in self.widths.items():
+            worksheet.column_dimensions[get_column_letter(col_idx)].width = min(width + 2, self.max_width)
+
+        for row_idx, row in enumerate(self.rows, 1):
+            if not styled:
+                worksheet.append(row)
+                continue
+            cells = []
+            merge_next = False
+            for col_idx, value in enumerate(row, 1):
+                cell = WriteOnlyCell(worksheet, value=value if value != '' else None)
+                # The cell swallowed by a merged header keeps the header style so the fill spans both
+                cell.style = HEADER_STYLE if value in SECTION_HEADERS | COLUMN_HEADERS or merge_next else CELL_STYLE
+                merge_next = value in MERGED_HEADERS
+                if merge_next:
+                    worksheet.merged_cells.add(CellRange(min_col=col_idx, min_row=row_idx, max_col=col_idx + 1, max_row=row_idx))
+                cells.append(cell)
+            worksheet.append(cells)
+
+def _summary_rows(program_summary: str, weeks: Iterable[Tuple[str, List[Any]]]) -> SheetRows:
+    rows = SheetRows(max_width=50)
+    rows.append(['FITNESS PROGRAM SUMMARY'])
+    rows.append([program_summary])
+    rows.append([])
+    rows.append(['Week', 'Days', 'Focus Areas'])
+
+    for week_key, week_data in weeks:
+        focus_areas: Dict[str, None] = {}  # ordered set
+        for day_data in week_data:
+            day_data = _as_dict(day_data)
+            if day_data.get('power'):
+                focus_areas['Power'] = None
+            if day_data.get('circuit_1') or day_data.get('circuit_2'):
+                focus_areas['Strength/Circuit'] = None
+            if day_data.get('finisher'):
+                focus_areas['Conditioning'] = None
+        rows.append([week_key.replace('week', 'Week '), len(week_data), ', '.join(focus_areas)])
+    return rows
+
+def _circuit_rows(circuit: Optional[dict], label: str) -> List[List[Any]]:
+    if not circuit:
+        return []
+    circuit = _as_dict(circuit)
+    return [
+        [
+            exercise.get('name', ''),
+            '',
+            f"{label} - RPE {exercise.get('rpe', '')}",
+            f"{circuit.get('rounds', '')} rounds x {exercise.get('reps', '')} reps",
+            '',
+            f"{circuit.get('rest', '')}s rest",
+        ]
+        for exercise in map(_as_dict, circuit.get('exercises', []))
+    ]
+
+def _day_rows(day_data: dict) -> SheetRows:
+    """One training day laid out like the coaching template."""
+    rows = SheetRows(max_width=30)
+    blank = [''] * DAY_COLUMNS
+    # Rows with a first-column value that isn't a header; used to pad the resistance section to 10
+    filled = 0
+
+    def add(row: List[Any]) -> None:
+        nonlocal filled
+        if row[0] and not any(word in row[0] for word in ('Resistance Training', 'Notes', 'Correctives', 'Power', 'Energy')):
+            filled += 1
+        rows.append(row)
+
+    day_name = day_data.get('day', 'Unknown Day')
+    add(['Date:', '', '', 'Routine:', f'Day {day_name}', ''])
+
+    add(['Correctives/Movement Prep', '', '', 'Notes', '', ''])
+    movement_prep = day_data.get('movement_prep', [])
+    for prep in map(_as_dict, movement_prep):
+        for label, key in (('foam roll', 'foam_rolling'), ('dynamic stretches', 'dynamic_stretches'), ('activation', 'activation_exercises')):
+            if prep.get(key):
+                add([label, ', '.join(prep[key]), '', '', '', ''])
+    if not movement_prep:
+        for _ in range(3):
+            add(list(blank))
+
+    add(['Power/Speed/Agility Training', '', 'Notes', 'Sets/Reps/Time', 'Load', 'Rest'])
+    add([day_data.get('power', ''), '', '', '', '', ''])
+    for _ in range(3):
+        add(list(blank))
+
+    add(['Resistance Training', '', 'Notes', 'Sets/Reps/Time', 'Load', 'Rest'])
+    for row in _circuit_rows(day_data.get('circuit_1'), 'Circuit 1') + _circuit_rows(day_data.get('circuit_2'), 'Circuit 2'):
+        add(row)
+    for _ in range(max(0, 10 - filled)):
+        add(list(blank))
+
+    add(['Energy System Development', '', 'Notes', 'Volume/Intensity/Rest', '', ''])
+    add([day_data.get('finisher', ''), '', '', '', '', ''])
+    for _ in range(2):
+        add(list(blank))
+    return rows
+
+def convert_program_to_excel(program_data: dict) -> io.BytesIO:
+    """
+    Convert program data to Excel format matching the workout template structure.
+
+    Rows are streamed once into a write-only workbook: styles are shared named
+    styles, merges are recorded as rows go out and column widths come from the
+    values as each sheet's rows are built. Accepts a compact `program` or an
+    expanded `full_program`.
+    """
+    workbook = Workbook(write_only=True)
+    _add_named_styles(workbook)
+    _summary_rows(program_data['program_summary'], program_weeks(program_data)).write(workbook, 'Summary')
+
+    # Compact programs are expanded a week at a time as the sheets are written
+    for week_key, week_data in program_weeks(program_data):
+        week_name = week_key.replace('week', 'Week ')
+        for day_data in map(_as_dict, week_data):
+            sheet_name = f"{week_name} - Day {day_data.get('day', 'Unknown Day')}"
+            _day_rows(day_data).write(workbook, sheet_name, styled=True)
+
+    excel_buffer = io.BytesIO()
+    workbook.save(excel_buffer)
+    excel_buffer.seek(0)
+    return excel_buffer
+
+def _iter_chunks(buffer: io.BytesIO) -> Iterator[bytes]:
+    with buffer:
+        buffer.seek(0)
+        while chunk := buffer.read(CHUNK_SIZE):
+            yield chunk
+
+def excel_response(excel_buffer: io.BytesIO, filename: str) -> StreamingResponse:
+    """Send a workbook straight from memory in chunks; the buffer is released once sent."""
+    return StreamingResponse(
+        _iter_chunks(excel_buffer),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(excel_buffer.getbuffer().nbytes),
+        },
+    )
@@ -0,0 +1,81 @@
+"""
+Rule-based weekly progressions: the same rules program_progression_crew is
+prompted with (tasks.yaml `add_progressions`), applied directly.
+
+Each circuit exercise adds 2 reps a week, capped at 14. The week after 14 the intensity goes
+up and reps drop back to 8; plans carry no load, so the intensity bump is +1
+RPE, standing in for the +5% load. Once RPE is capped the exercise has
+plateaued and moves to its next variant on the CFSC sheet, starting again from
+its week-1 reps and RPE. The power exercise steps to its next variant every
+`power_step_weeks` weeks.
+"""
+from pathlib import Path
+from typing import List, Optional
+
+from agents.core.cfsc_catalog import CATALOG_PATH, ExerciseCatalog
+from agents.core.registry import registry
+from agents.models.workout import Circuit, ExerciseSet, WorkoutPlan, WorkoutProgressions
+
+# Files whose contents decide the progressions, for cache keys
+PROGRESSION_SOURCE_PATHS = [Path(__file__), CATALOG_PATH]
+
+class ProgressionRules:
+    def __init__(
+        self,
+        catalog: Optional[ExerciseCatalog] = None,
+        rep_step: int = 2,
+        max_reps: int = 14,
+        reset_reps: int = 8,
+        rpe_step: int = 1,
+        max_rpe: int = 9,
+        power_step_weeks: int = 2,
+    ):
+        self.catalog = catalog
+        self.rep_step = rep_step
+        self.max_reps = max_reps
+        self.reset_reps = reset_reps
+        self.rpe_step = rpe_step
+        self.max_rpe = max_rpe
+        self.power_step_weeks = power_step_weeks
+
+    def progress_set(self, exercise: ExerciseSet, baseline: ExerciseSet) -> ExerciseSet:
+        """One week of progression for a single exercise: volume, then intensity, then variant."""
+        if exercise.reps < self.max_reps:
+            # Odd starting reps land on the cap rather than skipping it for the RPE bump
+            return exercise.model_copy(update={"reps": min(exercise.reps + self.rep_step, self.max_reps)})
+        if exercise.rpe + self.rpe_step <= self.max_rpe:
+            return exercise.model_copy(update={"reps": self.reset_reps, "rpe": exercise.rpe + self.rpe_step})
+        next_variant = self.catalog.next_progression(exercise.name) if self.catalog else None
+        if next_variant is None:
+            # Hardest variant on the sheet (or not on it): hold at the cap
+            return exercise.model_copy(update={"reps": self.max_reps, "rpe": self.max_rpe})
+        # The variant comes from the CFSC sheet, not the exercise library, so it has no library id
+        return exercise.model_copy(update={"name": next_variant, "exercise_id": None, "reps": baseline.reps, "rpe": baseline.rpe})
+
+    def progress_circuit(self, circuit: Circuit, baseline: Circuit) -> Circuit:
+        exercises = [
+            self.progress_set(exercise, base)
+            for exercise, base in zip(circuit.exercises, baseline.exercises)
+        ]
+        return circuit.model_copy(update={"exercises": exercises})
+
+    def progress_power(self, power: str, week_index: int) -> str:
+        if not self.catalog or self.power_step_weeks <= 0 or week_index % self.power_step_weeks:
+            return power
+        # Strict, so a power drill never turns into a near-named strength exercise
+        return self.catalog.next_progression(power, "Power", strict=True) or power
+
+    def progress_plan(self, workout_plan: WorkoutPlan, weeks: int) -> WorkoutProgressions:
+        """Progress a week-1 plan through `weeks` further weeks, each building on the last."""
+        progressions: List[WorkoutPlan] = []
+        current = workout_plan
+        for week_index in range(1, weeks + 1):
+            current = current.model_copy(update={
+                "power": self.progress_power(current.power, week_index),
+                "circuit_1": self.progress_circuit(current.circuit_1, workout_plan.circuit_1),
+                "circuit_2": self.progress_circuit(current.circuit_2, workout_plan.circuit_2),
+            })
+            progressions.append(current)
+        return WorkoutProgressions(progressions=progressions)
+
+registry.register("progression_rules", lambda: ProgressionRules(registry.get("cfsc_catalog")))
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+class LazyRegistry:
+    """
+    Builds named components (crews, knowledge sources, ...) on first use and keeps them
+    for the lifetime of the process. Importing a module only registers its factory, so a
+    slow build or a bad API key surfaces when the component is used instead of at startup.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self.build_times: Dict[str, float] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        with self._registry_lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        """Return the component, building it on first use. Concurrent callers wait for a single build."""
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self._factories:
+            raise KeyError(f"No component registered as '{name}'")
+        with self._locks[name]:
+            if name not in self._instances:
+                start_time = time.perf_counter()
+                try:
+                    self._instances[name] = self._factories[name]()
+                except Exception as e:
+                    self._errors[name] = repr(e)
+                    raise
+                self._errors.pop(name, None)
+                self.build_times[name] = time.perf_counter() - start_time
+                logger.info("Built %s in %.2fs", name, self.build_times[name])
+        return self._instances[name]
+
+    def reset(self, name: str) -> None:
+        """Drop a built component so the next get() rebuilds it."""
+        self._instances.pop(name, None)
+        self.build_times.pop(name, None)
+
+    def status(self) -> Dict[str, str]:
+        return {
+            name: "ready" if name in self._instances else f"failed: {self._errors[name]}" if name in self._errors else "pending"
+            for name in self._factories
+        }
+
+    async def warm_up(self, names: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Build components in a worker thread so the event loop keeps serving requests.
+        Failures are logged and left for the first real use to retry.
+        """
+        start_time = time.perf_counter()
+        for name in list(names or self._factories):
+            try:
+                await asyncio.to_thread(self.get, name)
+            except Exception as e:
+                logger.warning("Warm-up failed for %s: %r", name, e)
+        logger.info("Warm-up finished in %.2fs", time.perf_counter() - start_time)
+        return self.status()
+
+registry = LazyRegistry()
@@ -0,0 +1,126 @@
+"""
+Candidate exercises for every ExerciseType slot a WorkoutOutline can contain.
+
+A slot is a (pattern, angle, balance) triple, each from a small enum (angle and
+balance may be unset), so the whole table is under a hundred rows. It's built
+once per version of the exercise library from:
+  - the exercise library (in-memory exercise catalog), which gives linkable ids
+  - the CFSC sheet, whose categories map onto pattern and angle, and whose
+    baseline (bold) variant of each group is a sensible starting exercise
+
+The transform stage gets the rows for the day's slots as plain text, so the LLM
+chooses from short concrete lists instead of searching.
+"""
+from itertools import product
+from typing import Dict, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel
+
+from agents.core.cfsc_catalog import ExerciseCatalog, normalize_name
+from agents.core.registry import registry
+from agents.models.movement import BalanceType, ExerciseAngle, ExerciseType, MovementPattern
+from agents.services.exercise_catalog import ExerciseIndex
+
+SlotKey = Tuple[str, Optional[str], Optional[str]]
+
+# CFSC categories for a pattern, narrowed by angle where the sheet splits on it
+PATTERN_CATEGORIES: Dict[str, Dict[Optional[str], List[str]]] = {
+    "push": {"horizontal": ["Horizontal Press"], "vertical": ["Vertical Press"], None: ["Horizontal Press", "Vertical Press"]},
+    "pull": {"horizontal": ["Horizontal Pull"], "vertical": ["Vertical Pull"], None: ["Horizontal Pull", "Vertical Pull"]},
+    "squat": {None: ["Knee Dominant"]},
+    "lunge": {None: ["Knee Dominant"]},
+    "hinge": {None: ["Hip Dominant"]},
+    "core": {None: ["Anti-Extension", "Anti-Rotation", "Anti-Lateral Flexion", "Anti-Extension/Rotation"]},
+    "rotational": {None: ["Anti-Rotation", "Anti-Extension/Rotation"]},
+    "locomotive": {None: ["Ladder Drills"]},
+}
+# Words (after expanding the sheet's abbreviations) that mark a one-sided exercise
+UNILATERAL_MARKERS = ("split", "single leg", "one arm", "1 arm", "1 leg", "alternating", "suitcase", "rear foot elevated", "half kneeling")
+
+class SlotCandidate(BaseModel):
+    name: str
+    source: Literal["library", "cfsc"]
+    exercise_id: Optional[str] = None
+
+def slot_key(slot: ExerciseType) -> SlotKey:
+    return (
+        slot.pattern.value,
+        slot.angle.value if slot.angle else None,
+        slot.balance.value if slot.balance else None,
+    )
+
+def all_slot_keys() -> List[SlotKey]:
+    return list(product(
+        [pattern.value for pattern in MovementPattern],
+        [None, *(angle.value for angle in ExerciseAngle)],
+        [None, *(balance.value for balance in BalanceType)],
+    ))
+
+def is_unilateral(name: str) -> bool:
+    normalized = normalize_name(name.replace("1/2", "half").replace("-", " "))
+    return any(marker in normalized for marker in UNILATERAL_MARKERS)
+
+def _cfsc_candidates(cfsc: ExerciseCatalog, key: SlotKey) -> List[SlotCandidate]:
+    pattern, angle, balance = key
+    categories = PATTERN_CATEGORIES.get(pattern, {})
+    names = []
+    for category in categories.get(angle, categories.get(None, [])):
+        for group in cfsc.data.categories.get(category, []):
+            if not group.variants:
+                continue
+            variant = next((variant for variant in group.variants if variant.baseline), group.variants[0])
+            if balance is None or is_unilateral(variant.name) == (balance == "unilateral"):
+                names.append(variant.name)
+    return [SlotCandidate(name=name, source="cfsc") for name in dict.fromkeys(names)]
+
+def _library_candidates(index: ExerciseIndex, key: SlotKey, limit: int) -> List[SlotCandidate]:
+    pattern, angle, balance = key
+    # Over-fetch so exercises matching the angle can be moved to the front
+    positions, _ = index.page(index.match(pattern=[pattern], balance=[balance] if balance else None), limit * 4 if angle else limit)
+    records = [index.records[position] for position in positions]
+    if angle:
+        # The library has no angle column; names like "Horizontal Row" are the best signal
+        records.sort(key=lambda record: angle not in record["name"].lower())
+    return [SlotCandidate(name=record["name"], source="library", exercise_id=record["id"]) for record in records[:limit]]
+
+class SlotCandidateTable:
+    """Slot → candidates for every slot; library candidates first since they carry ids."""
+
+    def __init__(self, rows: Dict[SlotKey, List[SlotCandidate]], library_version: Optional[tuple] = None):
+        self.rows = rows
+        self.library_version = library_version
+
+    @classmethod
+    def build(cls, cfsc: ExerciseCatalog, index: Optional[ExerciseIndex] = None, per_source: int = 4) -> "SlotCandidateTable":
+        rows = {}
+        for key in all_slot_keys():
+            library = _library_candidates(index, key, per_source) if index is not None else []
+            rows[key] = library + _cfsc_candidates(cfsc, key)[:per_source]
+        return cls(rows, index.version if index is not None else None)
+
+    def candidates(self, slot: ExerciseType) -> List[SlotCandidate]:
+        return self.rows.get(slot_key(slot), [])
+
+    def describe(self, outline: dict) -> str:
+        """The candidates for one day outline's group_1/group_2 slots, one line per slot."""
+        lines = []
+        for group in ("group_1", "group_2"):
+            for position, slot in enumerate(outline.get(group, [])):
+                slot = ExerciseType.model_validate(slot)
+                label = "/".join(part for part in slot_key(slot) if part)
+                options = "; ".join(
+                    f"{candidate.name} (id {candidate.exercise_id})" if candidate.exercise_id else f"{candidate.name} (CFSC)"
+                    for candidate in self.candidates(slot)
+                ) or "none, use exercise_lookup"
+                lines.append(f"{group}[{position}] {label}: {options}")
+        return "\n".join(lines)
+
+_table: Optional[SlotCandidateTable] = None
+
+def slot_candidate_table(index: Optional[ExerciseIndex] = None) -> SlotCandidateTable:
+    """The table for this version of the exercise library, rebuilt only when the library changes."""
+    global _table
+    version = index.version if index is not None else None
+    if _table is None or _table.library_version != version:
+        _table = SlotCandidateTable.build(registry.get("cfsc_catalog"), index)
+    return _table
@@ -0,0 +1,15 @@
+import sqlite3
+from pathlib import Path
+
+def connect_sqlite(path: str | Path) -> sqlite3.Connection:
+    """
+    Open a SQLite database for use from multiple threads.
+    Creates the parent directory if needed and enables WAL so readers don't block the writer.
+    Callers are responsible for serializing access to the returned connection.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
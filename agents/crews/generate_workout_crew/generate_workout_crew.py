@@ -1,20 +1,16 @@
 from crewai import Agent, Task, Crew, LLM, Process
-from crewai.knowledge.source.pdf_knowledge_source import PDFKnowledgeSource
 from crewai.project import CrewBase, agent, task, crew, before_kickoff, after_kickoff
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List
 from core.config import settings
-from agents.listeners.custom_listener import MyCustomListener
+from agents.core.llm_scheduler import ScheduledLLM
+from agents.core.registry import registry
+import agents.core.knowledge  # registers the shared CFSC knowledge source
 from models.movement import MovementPattern, MovementPlane, BalanceType
 
-my_listener = MyCustomListener()
-
 import os
 os.environ["OPENAI_API_KEY"] = settings.OPENAI_API_KEY
 
-# initialize models
-llama8b_llm = LLM(model="groq/llama-3.1-8b-instant", api_key=settings.GROQ_API_KEY)
-
 # Define file paths for YAML configurations
 # files = {
 #     'agents': 'crews/generate_workout_crew/config/agents.yaml',
@@ -27,13 +23,6 @@ llama8b_llm = LLM(model="groq/llama-3.1-8b-instant", api_key=settings.GROQ_API_K
 #     with open(file_path, 'r') as file:
 #         configs[config_type] = yaml.safe_load(file)
 
-# load pdf knowledge sources
-pdf_source = PDFKnowledgeSource(
-    file_paths=[
-        "CFSC_Regression:Progression_Sheet_2023.pdf",
-    ]   
-)
-
 @CrewBase
 class GenerateWorkoutCrew:
     """
@@ -49,6 +38,10 @@ class GenerateWorkoutCrew:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
+    def __init__(self):
+        # initialize models
+        self.llama8b_llm = ScheduledLLM(model="groq/llama-3.1-8b-instant", api_key=settings.GROQ_API_KEY)
+
     @before_kickoff
     def prepare_inputs(self, inputs):
         # Modify inputs before the crew starts
@@ -65,7 +58,7 @@ class GenerateWorkoutCrew:
     def workout_outline_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['workout_outline_agent'],
-            llm=llama8b_llm,
+            llm=self.llama8b_llm,
             verbose=True
         )
 
@@ -73,8 +66,8 @@ class GenerateWorkoutCrew:
     def exercise_selection_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['exercise_selection_agent'],
-            llm=llama8b_llm,
-            knowledge_sources=[pdf_source],
+            llm=self.llama8b_llm,
+            knowledge=registry.get("cfsc_knowledge"),
             verbose=True
         )
 
@@ -102,6 +95,8 @@ class GenerateWorkoutCrew:
             verbose=True,
         )
 
+registry.register("generate_workout_crew", lambda: GenerateWorkoutCrew().crew())
+
 movement_patterns = [member.value for member in MovementPattern]
 balance_type = [member.value for member in BalanceType]
 movement_plane = [member.value for member in MovementPlane]
\ No newline at end of file
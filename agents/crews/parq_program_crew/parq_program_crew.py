@@ -1,84 +1,82 @@
 import yaml
+from pathlib import Path
 from crewai import Agent, Task, Crew, LLM
-from crewai.knowledge.source.pdf_knowledge_source import PDFKnowledgeSource
 # from models.program import FitnessProgram
 from models.profile import Client, FitnessProfile
 from models.movement import MovementPattern, MovementPlane, BalanceType
 from core.config import settings
-from agents.listeners.custom_listener import MyCustomListener
-
-my_listener = MyCustomListener()
+from agents.core.llm_scheduler import ScheduledLLM
+from agents.core.registry import registry
+import agents.core.knowledge  # registers the shared CFSC knowledge source
 
 import os
 os.environ["OPENAI_API_KEY"] = settings.OPENAI_API_KEY
-# initialize models
-# qwen_qwq_llm = LLM(model="groq/qwen-qwq-32b", api_key=settings.GROQ_API_KEY)
-# llama70b_llm = LLM(model="groq/llama-3.3-70b-versatile", api_key=settings.GROQ_API_KEY)
-# gpt_4o_llm = LLM(model="openai/gpt-4o-mini", api_key=settings.OPENAI_API_KEY)
-llama8b_llm = LLM(model="groq/llama-3.1-8b-instant", api_key=settings.GROQ_API_KEY)
 
-# Define file paths for YAML configurations
-files = {
-    'agents': 'crews/parq_program_crew/config/agents.yaml',
-    'tasks': 'crews/parq_program_crew/config/tasks.yaml'
-}
+CONFIG_DIR = Path(__file__).parent / "config"
+
+def build_parq_program_crew() -> Crew:
+    # initialize models
+    # qwen_qwq_llm = LLM(model="groq/qwen-qwq-32b", api_key=settings.GROQ_API_KEY)
+    # llama70b_llm = LLM(model="groq/llama-3.3-70b-versatile", api_key=settings.GROQ_API_KEY)
+    # gpt_4o_llm = LLM(model="openai/gpt-4o-mini", api_key=settings.OPENAI_API_KEY)
+    llama8b_llm = ScheduledLLM(model="groq/llama-3.1-8b-instant", api_key=settings.GROQ_API_KEY)
+
+    # Define file paths for YAML configurations
+    files = {
+        'agents': CONFIG_DIR / 'agents.yaml',
+        'tasks': CONFIG_DIR / 'tasks.yaml'
+    }
 
-# Load configurations from YAML files
-configs = {}
-for config_type, file_path in files.items():
-    with open(file_path, 'r') as file:
-        configs[config_type] = yaml.safe_load(file)
+    # Load configurations from YAML files
+    configs = {}
+    for config_type, file_path in files.items():
+        with open(file_path, 'r') as file:
+            configs[config_type] = yaml.safe_load(file)
 
-# Assign loaded configurations to specific variables
-agents_config = configs['agents']
-tasks_config = configs['tasks']
+    # Assign loaded configurations to specific variables
+    agents_config = configs['agents']
+    tasks_config = configs['tasks']
 
-# load pdf knowledge sources
-pdf_source = PDFKnowledgeSource(
-    file_paths=[
-        "CFSC_Regression:Progression_Sheet_2023.pdf",
-    ]
-    
-)
+    # Creating Agents
+    fitness_program_agent = Agent(
+      config=agents_config['fitness_program_agent'],
+      llm=llama8b_llm,
+      knowledge=registry.get("cfsc_knowledge"),
+    )
 
-# Creating Agents
-fitness_program_agent = Agent(
-  config=agents_config['fitness_program_agent'],
-  llm=llama8b_llm,
-  knowledge_sources=[pdf_source],
-)
+    profile_analyst_agent = Agent(
+      config=agents_config['profile_analyst_agent'],
+      llm=llama8b_llm
+    )
 
-profile_analyst_agent = Agent(
-  config=agents_config['profile_analyst_agent'],
-  llm=llama8b_llm
-)
+    # Creating Tasks
+    profile_analysis_task = Task(
+      config=tasks_config['fitness_profile_breakdown'],
+      agent=profile_analyst_agent,
+      # output_pydantic=ProfileAnalysis
+    )
 
-# Creating Tasks
-profile_analysis_task = Task(
-  config=tasks_config['fitness_profile_breakdown'],
-  agent=profile_analyst_agent,
-  # output_pydantic=ProfileAnalysis
-)
+    program_design_task = Task(
+      config=tasks_config['fitness_program_designer'],
+      agent=fitness_program_agent,
+      context=[profile_analysis_task],
+      # output_pydantic=FitnessProgram
+    )
 
-program_design_task = Task(
-  config=tasks_config['fitness_program_designer'],
-  agent=fitness_program_agent,
-  context=[profile_analysis_task],
-  # output_pydantic=FitnessProgram
-)
+    # Creating Crew
+    return Crew(
+      agents=[
+        profile_analyst_agent,
+        fitness_program_agent,
+      ],
+      tasks=[
+        profile_analysis_task,
+        program_design_task
+      ],
+      verbose=True,
+    )
 
-# Creating Crew
-parq_program_crew = Crew(
-  agents=[
-    profile_analyst_agent,
-    fitness_program_agent,
-  ],
-  tasks=[
-    profile_analysis_task,
-    program_design_task
-  ],
-  verbose=True,
-)
+registry.register("parq_program_crew", build_parq_program_crew)
 
 # Test Crew Inputs
 client = Client(name="Brooke Lynn", email="brooke.lynn@status.com", age=32).model_dump()
@@ -1,23 +1,20 @@
 from crewai.flow.flow import Flow, listen, start
-from litellm import completion
 from core.config import settings
-from agents.listeners.custom_listener import MyCustomListener
+from agents.core.llm_scheduler import llm_scheduler
 
 import os
 os.environ["OPENAI_API_KEY"] = settings.OPENAI_API_KEY
 
-example_flow_listener = MyCustomListener()
-
 class ExampleFlow(Flow):
     model = "gpt-4o-mini"
 
     @start()
-    def generate_city(self):
+    async def generate_city(self):
         print("Starting flow")
         # Each flow state automatically gets a unique ID
         print(f"Flow State ID: {self.state['id']}")
 
-        response = completion(
+        response = await llm_scheduler.acompletion(
             model=self.model,
             messages=[
                 {
@@ -35,8 +32,8 @@ class ExampleFlow(Flow):
         return random_city
 
     @listen(generate_city)
-    def generate_fun_fact(self, random_city):
-        response = completion(
+    async def generate_fun_fact(self, random_city):
+        response = await llm_scheduler.acompletion(
             model=self.model,
             messages=[
                 {
@@ -1,68 +1,73 @@
 import yaml
+from pathlib import Path
 from crewai import Agent, Task, Crew, LLM
-from crewai.knowledge.source.pdf_knowledge_source import PDFKnowledgeSource
 from core.config import settings
+from agents.core.llm_scheduler import ScheduledLLM
+from agents.core.registry import registry
+import agents.core.knowledge  # registers the shared CFSC knowledge source
 # from agents.listeners.custom_listener import MyCustomListener
 from agents.models.workout import WorkoutPlan
+from agents.tools.exercise_lookup_tool import ExerciseLookupTool
 
 # transform_outline_listener = MyCustomListener()
 
 import os
 os.environ["OPENAI_API_KEY"] = settings.OPENAI_API_KEY
 
-# initialize models
-llama8b_llm = LLM(model="groq/llama-3.1-8b-instant", api_key=settings.GROQ_API_KEY)
-llama_4_llm = LLM(model="groq/meta-llama/llama-4-maverick-17b-128e-instruct", api_key=settings.GROQ_API_KEY)
-kimi_k2_llm = LLM(model="groq/moonshotai/kimi-k2-instruct-0905", api_key=settings.GROQ_API_KEY)
+CONFIG_DIR = Path(__file__).parent / "config"
 
-# Define file paths for YAML configurations
-files = {
-  'agents': 'flows/generate_program_flow/crews/transform_outline_crew/config/agents.yaml',
-  'tasks': 'flows/generate_program_flow/crews/transform_outline_crew/config/tasks.yaml'
-}
+def build_transform_outline_crew() -> Crew:
+  # initialize models
+  # llama8b_llm = LLM(model="groq/llama-3.1-8b-instant", api_key=settings.GROQ_API_KEY)
+  # llama_4_llm = LLM(model="groq/meta-llama/llama-4-maverick-17b-128e-instruct", api_key=settings.GROQ_API_KEY)
+  # kimi_k2_llm = LLM(model="groq/moonshotai/kimi-k2-instruct-0905", api_key=settings.GROQ_API_KEY)
 
-# Load configurations from YAML files
-configs = {}
-for config_type, file_path in files.items():
-  with open(file_path, 'r') as file:
-    configs[config_type] = yaml.safe_load(file)
+  # Define file paths for YAML configurations
+  files = {
+    'agents': CONFIG_DIR / 'agents.yaml',
+    'tasks': CONFIG_DIR / 'tasks.yaml'
+  }
 
-# Assign loaded configurations to specific variables
-agents_config = configs['agents']
-tasks_config = configs['tasks']
+  # Load configurations from YAML files
+  configs = {}
+  for config_type, file_path in files.items():
+    with open(file_path, 'r') as file:
+      configs[config_type] = yaml.safe_load(file)
 
-# load pdf knowledge sources
-pdf_source = PDFKnowledgeSource(
-  file_paths=[
-    "CFSC_Regression:Progression_Sheet_2023.pdf",
-  ]
-)
+  # Assign loaded configurations to specific variables
+  agents_config = configs['agents']
+  tasks_config = configs['tasks']
 
-# Creating Agents
-transform_outline_agent = Agent(
-  config=agents_config['transform_outline_agent'],
-  # llm=llama8b_llm,
-  # llm=llama_4_llm,
-  # llm=kimi_k2_llm,
-  llm="gpt-4.1",
-  knowledge_sources=[pdf_source],
-  # reasoning=True,
-)
+  # Creating Agents
+  transform_outline_agent = Agent(
+    config=agents_config['transform_outline_agent'],
+    # llm=llama8b_llm,
+    # llm=llama_4_llm,
+    # llm=kimi_k2_llm,
+    llm=ScheduledLLM(model="gpt-4.1"),
+    # Circuit exercises come from the exercise library through the lookup tool; the
+    # CFSC sheet stays available for activation drills and as a fallback
+    tools=[ExerciseLookupTool()],
+    knowledge=registry.get("cfsc_knowledge"),
+    # reasoning=True,
+  )
 
-# Creating Tasks
-transform_outline_task = Task(
-  config=tasks_config['transform_outline'],
-  agent=transform_outline_agent,
-  output_pydantic=WorkoutPlan
-)
+  # Creating Tasks
+  transform_outline_task = Task(
+    config=tasks_config['transform_outline'],
+    agent=transform_outline_agent,
+    output_pydantic=WorkoutPlan
+  )
 
-# Creating Crew
-transform_outline_crew = Crew(
-  agents=[
-    transform_outline_agent,
-  ],
-  tasks=[
-    transform_outline_task,
-  ],
-  verbose=True,
-)
+  # Creating Crew
+  return Crew(
+    agents=[
+      transform_outline_agent,
+    ],
+    tasks=[
+      transform_outline_task,
+    ],
+    verbose=True,
+  )
+
+registry.register("transform_outline_crew", build_transform_outline_crew)
@@ -1,20 +1,66 @@
 from crewai import LLM
-from crewai.flow.flow import Flow, listen, start
-from litellm import completion
+from crewai.flow.flow import Flow, listen, router, start
+from pathlib import Path
+import asyncio
+import logging
+import time
 from pydantic import BaseModel
-from typing import List
+from typing import List, Literal, Optional
 
 from core.config import settings
+from agents.core.cache import canonical_hash, create_cache, file_fingerprint
+from agents.core.checkpoints import checkpoints
+from agents.core.compact_program import compact_program
+from agents.core.concurrency import gather_bounded
+from agents.core.crew_cache import CachedCrew
+from agents.core.database import database
+from agents.core.llm_scheduler import llm_scheduler
+from agents.core.outline_templates import outline_templates, personalize_outline
+from agents.core.program_digest import count_tokens, fit_digest
+from agents.listeners.custom_listener import DEFAULT_RUN_ID, current_run_id, publish_run_event
 from agents.models.profile import FMS
-from agents.flows.generate_program_flow.crews.week_outline_crew.week_outline_crew import week_outline_crew
-from agents.flows.generate_program_flow.crews.transform_outline_crew.transform_outline_crew import transform_outline_crew
-from agents.flows.generate_program_flow.crews.program_progression_crew.program_progression_crew import program_progression_crew
+from agents.core.registry import registry
+from agents.core.slot_candidates import slot_candidate_table
+from agents.services.exercise_catalog import exercise_catalog
+# Importing the crew modules registers their factories; the crews are built on first use
+import agents.flows.generate_program_flow.crews.week_outline_crew.week_outline_crew
+import agents.flows.generate_program_flow.crews.transform_outline_crew.transform_outline_crew
+import agents.flows.generate_program_flow.crews.program_progression_crew.program_progression_crew
+from agents.core.progression import PROGRESSION_SOURCE_PATHS  # also registers the rule-based progressions
 from agents.models.program import WeekOutline
-from agents.models.workout import WorkoutPlan
+from agents.models.workout import CompactProgram, WorkoutPlan, WorkoutProgressions
 
-from agents.listeners.custom_listener import MyCustomListener
+logger = logging.getLogger(__name__)
 
-program_flow_listener = MyCustomListener()
+# Full program results keyed on everything that can change the generated program
+program_cache = create_cache(
+    "programs",
+    ttl=settings.PROGRAM_CACHE_TTL,
+    memory_entries=settings.PROGRAM_CACHE_MEMORY_ENTRIES,
+    max_bytes=settings.PROGRAM_CACHE_MAX_BYTES,
+    cache_dir=settings.CACHE_DIR,
+)
+
+# Crew modules (which pick the models) and prompt configs for every crew in the flow;
+# editing any of them invalidates cached programs
+CREWS_DIR = Path(__file__).parent / "crews"
+CREW_SOURCE_PATHS = sorted([*CREWS_DIR.glob("*/*.py"), *CREWS_DIR.glob("*/config/*.yaml")])
+
+# Each crew stage is also cached on its own inputs, so programs that share a
+# week outline day or a workout plan reuse that part even when the FMS differs
+stage_cache = create_cache(
+    "program_stages",
+    ttl=settings.STAGE_CACHE_TTL,
+    memory_entries=settings.STAGE_CACHE_MEMORY_ENTRIES,
+    max_bytes=settings.STAGE_CACHE_MAX_BYTES,
+    cache_dir=settings.CACHE_DIR,
+)
+week_outline_stage = CachedCrew("week_outline", lambda: registry.get("week_outline_crew"), CREWS_DIR / "week_outline_crew", stage_cache, WeekOutline)
+transform_outline_stage = CachedCrew("transform_outline", lambda: registry.get("transform_outline_crew"), CREWS_DIR / "transform_outline_crew", stage_cache, WorkoutPlan)
+program_progression_stage = CachedCrew("program_progression", lambda: registry.get("program_progression_crew"), CREWS_DIR / "program_progression_crew", stage_cache, WorkoutProgressions)
+
+# Shape of cached results; change it when the result structure changes so old entries miss
+PROGRAM_RESULT_FORMAT = "compact-v1"
 
 class ProgramState(BaseModel):
     fms_analysis: str = ""
@@ -23,136 +69,312 @@ class ProgramState(BaseModel):
     program_summary: str = ""
     # workout_plan: WorkoutPlan = None
 
+ProgressionMode = Literal["rules", "creative"]
+
+PROGRAM_DAYS = 3
+PROGRAM_WEEKS = 4
+PROGRAM_MODEL = "groq/llama-3.1-8b-instant"
+
+def program_cache_key(fms: dict, coach_notes: Optional[str], progression_mode: Optional[ProgressionMode] = None) -> str:
+    """Hash of the flow inputs, models and prompt configs that determine the program, without building a flow."""
+    return canonical_hash(
+        fms,
+        coach_notes,
+        PROGRAM_DAYS,
+        PROGRAM_WEEKS,
+        PROGRAM_MODEL,
+        progression_mode or settings.PROGRAM_PROGRESSION_MODE,
+        settings.OUTLINE_TEMPLATES_ENABLED,
+        PROGRAM_RESULT_FORMAT,
+        file_fingerprint([*CREW_SOURCE_PATHS, *PROGRESSION_SOURCE_PATHS]),
+    )
+
 class GenerateProgramFlow(Flow[ProgramState]):
-    def __init__(self, fms: dict = None, coach_notes: str = None):
+    def __init__(self, fms: dict = None, coach_notes: str = None, max_concurrency: int = None, refresh: bool = False, progression_mode: ProgressionMode = None, run_id: str = None):
         super().__init__()
         self.fms = fms
         self.coach_notes = coach_notes
         self.fitness_history = "minor ankle sprain in right ankle 5 years ago, but no other injuries. still active in tennis"
-        self.days = 3
-        self.weeks = 4
-        self.model = "groq/llama-3.1-8b-instant"
-   
+        self.days = PROGRAM_DAYS
+        self.weeks = PROGRAM_WEEKS
+        self.model = PROGRAM_MODEL
+        # Upper bound on crew kickoffs running at the same time within a step
+        self.max_concurrency = max_concurrency or settings.PROGRAM_FLOW_MAX_CONCURRENCY
+        # Per-attempt timeout (seconds) and retry count for each crew kickoff
+        self.crew_timeout = settings.PROGRAM_FLOW_CREW_TIMEOUT
+        self.crew_retries = settings.PROGRAM_FLOW_CREW_RETRIES
+        # "rules" progresses week 1 with ProgressionRules; "creative" keeps the LLM crew
+        self.progression_mode = progression_mode or settings.PROGRAM_PROGRESSION_MODE
+        if self.progression_mode not in ("rules", "creative"):
+            raise ValueError(f"Unknown progression mode '{self.progression_mode}'. Use 'rules' or 'creative'")
+        # Skip the program and stage cache lookups and regenerate (new results still replace the cached ones)
+        self.refresh = refresh
+        # Serve pregenerated week outlines when one exists for the FMS (not on refresh, which regenerates)
+        self.use_outline_templates = settings.OUTLINE_TEMPLATES_ENABLED and not refresh
+        # Completed steps (and days within them) are checkpointed under this run ID, so re-invoking
+        # with the same ID and inputs resumes after a failure; the shared default ID never is
+        self.run_id = run_id if run_id and run_id != DEFAULT_RUN_ID else None
+        self.cache_key = None
+        self.cache_hit = False
+        self.cached_program = None
+
+    def program_cache_key(self) -> str:
+        """Hash of the flow inputs, models and prompt configs that determine the program."""
+        return program_cache_key(self.fms, self.coach_notes, self.progression_mode)
+
+    def load_checkpoint(self, step: str, part: str = ""):
+        # A refresh regenerates every step, so it never resumes from earlier work
+        if self.run_id is None or self.refresh:
+            return None
+        value = checkpoints.get(self.run_id, self.cache_key, step, part)
+        if value is not None:
+            logger.info("Run %s: resuming %s%s from its checkpoint", self.run_id, step, f" ({part})" if part else "")
+        return value
+
+    def load_checkpoint_parts(self, step: str) -> dict:
+        return checkpoints.parts(self.run_id, self.cache_key, step) if self.run_id is not None and not self.refresh else {}
+
+    def save_checkpoint(self, step: str, value, part: str = "") -> None:
+        if self.run_id is not None:
+            checkpoints.put(self.run_id, self.cache_key, step, value, part)
+
+    def clear_checkpoints(self) -> None:
+        # The program is in the program cache; nothing left to resume
+        if self.run_id is not None:
+            checkpoints.clear(self.run_id)
+
     @start()
-    def analyze_fms(self):
-        print("Starting flow")
-        print(f"Analyzing FMS: {self.fms}")
-        print("Generating week outline ...")
+    async def check_cache(self):
+        self.cache_key = self.program_cache_key()
+        if self.run_id is not None:
+            # Checkpoints the run ID holds for other inputs can't be resumed by this run
+            checkpoints.discard_other_inputs(self.run_id, self.cache_key)
+        if self.refresh:
+            logger.info("Refresh requested, skipping program cache")
+            return None
+        # The SQLite tier does blocking I/O, so cache reads and writes stay off the event loop
+        self.cached_program = await asyncio.to_thread(program_cache.get, self.cache_key)
+        self.cache_hit = self.cached_program is not None
+        logger.info("Program cache %s: %s", "hit" if self.cache_hit else "miss", self.cache_key)
+        return self.cache_hit
+
+    @router(check_cache)
+    def route_on_cache(self):
+        return "cache_hit" if self.cache_hit else "cache_miss"
+
+    @listen("cache_hit")
+    def return_cached_program(self):
+        self.clear_checkpoints()
+        self.state.program_summary = self.cached_program["program_summary"]
+        return self.cached_program
+
+    @listen("cache_miss")
+    async def analyze_fms(self):
+        logger.info("Starting flow")
+        logger.info("Analyzing FMS: %s", self.fms)
+        saved = self.load_checkpoint("analyze_fms")
+        if saved is not None:
+            self.state.fms_analysis = saved["fms_analysis"]
+            self.state.week_outline = WeekOutline.model_validate(saved["week_outline"])
+            return self.state.week_outline
+
+        template = outline_templates.get(self.fms, self.days) if self.use_outline_templates else None
+        if template is not None:
+            logger.info("Using the pregenerated week outline for this FMS, personalizing ...")
+            self.state.fms_analysis = template.fms_analysis
+            self.state.week_outline = await personalize_outline(template.week_outline, self.coach_notes)
+            logger.debug("Week Outline: %s", self.state.week_outline)
+            self.save_checkpoint("analyze_fms", {"fms_analysis": self.state.fms_analysis, "week_outline": self.state.week_outline.model_dump()})
+            return self.state.week_outline
+
+        logger.info("Generating week outline ...")
         # Call the exercise selection crew
-        result = week_outline_crew.kickoff(
+        result = await week_outline_stage.kickoff_async(
             inputs={
                 "fms": self.fms,
                 "fitness_history": self.coach_notes,
                 "days": self.days,
-            }
+            },
+            refresh=self.refresh,
         )
-        self.state.fms_analysis = result.tasks_output[0].raw
+        self.state.fms_analysis = result.tasks_raw[0]
         self.state.week_outline = result.pydantic
         
-        print("FMS Analysis: ", result.tasks_output[0].raw)
-        print("Week Outline: ", result.pydantic)
+        logger.debug("FMS Analysis: %s", result.tasks_raw[0])
+        logger.debug("Week Outline: %s", result.pydantic)
 
+        self.save_checkpoint("analyze_fms", {"fms_analysis": self.state.fms_analysis, "week_outline": result.pydantic.model_dump()})
         return result.pydantic
     
     @listen(analyze_fms)
-    def generate_week_program(self, week_outline: WeekOutline):
+    async def generate_week_program(self, week_outline: WeekOutline):
         week_outline_dict = week_outline.model_dump()
-        week_plan = []
-        
-        # Loop through all days in the week outline
-        for i, day_outline in enumerate(week_outline_dict["days"]):
-            print(f"Transforming day {chr(65 + i)} outline to workout plan")
-            result = transform_outline_crew.kickoff(
+        # Days a previous attempt of this run already transformed, by position in the outline
+        saved_days = self.load_checkpoint_parts("generate_week_program")
+
+        # Resolve every exercise slot to candidates up front; without the library
+        # the table still has the CFSC sheet's candidates
+        candidates = None
+        if len(saved_days) < len(week_outline_dict["days"]):
+            try:
+                library = await exercise_catalog.get(await database.ensure_connected())
+            except Exception as e:
+                logger.warning("Exercise library unavailable for slot candidates: %r", e)
+                library = None
+            candidates = await asyncio.to_thread(slot_candidate_table, library)
+
+        async def transform_day(indexed_outline):
+            i, day_outline = indexed_outline
+            if str(i) in saved_days:
+                logger.info("Day %s workout plan restored from checkpoint", chr(65 + i))
+                return WorkoutPlan.model_validate(saved_days[str(i)])
+            logger.info("Transforming day %s outline to workout plan", chr(65 + i))
+            # Days are independent; the stage runs each one on its own copy of the crew
+            result = await transform_outline_stage.kickoff_async(
                 inputs={
                     "workout_outline": day_outline,
-                }
+                    "slot_candidates": candidates.describe(day_outline),
+                },
+                refresh=self.refresh,
             )
-            week_plan.append(result.pydantic)
-            print(f"Day {chr(65 + i)} Workout Plan: ", result.pydantic)
+            logger.debug("Day %s Workout Plan: %s", chr(65 + i), result.pydantic)
+            self.save_checkpoint("generate_week_program", result.pydantic.model_dump(), part=str(i))
+            return result.pydantic
+
+        # Fan out across all days in the week outline, keeping day order
+        week_plan = await gather_bounded(
+            list(enumerate(week_outline_dict["days"])),
+            transform_day,
+            self.max_concurrency,
+            timeout=self.crew_timeout,
+            retries=self.crew_retries,
+        )
         
         # Store the complete week plan in state
         self.state.week_plan = week_plan
-        print("Week Plan length: ", len(week_plan))
+        logger.info("Week Plan length: %d", len(week_plan))
         return week_plan
     
     @listen(generate_week_program)
-    def generate_weekly_progressions(self, week_plan: List[WorkoutPlan]):
-        # Convert week_plan to list of dictionaries for easier processing
-        week1_plan = [plan.model_dump() for plan in week_plan]
+    async def generate_weekly_progressions(self, week_plan: List[WorkoutPlan]):
         remaining_weeks = self.weeks - 1  # Total weeks minus week 1
-        full_program = {"week1": week1_plan}
-        progressions = {}
+        saved = self.load_checkpoint("generate_weekly_progressions")
+        if saved is not None:
+            return CompactProgram.model_validate(saved)
+        saved_days = self.load_checkpoint_parts("generate_weekly_progressions")
 
-        print(f"Generating progressions for {remaining_weeks} remaining weeks...")
+        logger.info("Generating %s progressions for %d remaining weeks...", self.progression_mode, remaining_weeks)
 
-        # Iterate through each day plan from week 1
-        for day_plan in week1_plan:
-            print(f"Generating progression for Day {day_plan['day']}")
-            
-            result = program_progression_crew.kickoff(
+        async def progress_day(day_plan: WorkoutPlan):
+            if day_plan.day in saved_days:
+                logger.info("Day %s progressions restored from checkpoint", day_plan.day)
+                return [WorkoutPlan.model_validate(plan) for plan in saved_days[day_plan.day]]
+            logger.info("Generating progression for Day %s", day_plan.day)
+            result = await program_progression_stage.kickoff_async(
                 inputs={
-                    "workout_plan": day_plan,
+                    "workout_plan": day_plan.model_dump(),
                     "remaining_weeks": remaining_weeks
-                }
+                },
+                refresh=self.refresh,
             )
+            logger.info("Day %s progressions generated", day_plan.day)
+            self.save_checkpoint("generate_weekly_progressions", [plan.model_dump() for plan in result.pydantic.progressions], part=day_plan.day)
+            return result.pydantic.progressions
 
-            progressions[f"day_{day_plan['day']}_progressions"] = result.pydantic.progressions
-            print(f"Day {day_plan['day']} progressions generated")
-        
-        # Transform progressions from day-based to week-based structure
-        print("Transforming progressions to week-based structure...")
-        
-        # Create week-based structure
-        for week_idx in range(remaining_weeks):
-            week_num = week_idx + 2  # Start from week 2
-            week_plan = []
-            
-            # For each day, get the progression for this specific week
-            for day_plan in week1_plan:
-                day_key = f"day_{day_plan['day']}_progressions"
-                week_progression = progressions[day_key][week_idx]
-                week_plan.append(week_progression)
-            
-            full_program[f"week{week_num}"] = week_plan
-            print(f"Week {week_num} structure created with {len(week_plan)} days")
-        
-        print("Full program generation completed")
-        return full_program
+        # Each day's progressions are independent, so run them all at once and
+        # only restructure by week after every day has finished
+        if self.progression_mode == "rules":
+            # Pure Python and near-instant, so no fan-out needed
+            rules = registry.get("progression_rules")
+            day_progressions = [rules.progress_plan(day_plan, remaining_weeks).progressions for day_plan in week_plan]
+        else:
+            day_progressions = await gather_bounded(
+                week_plan,
+                progress_day,
+                self.max_concurrency,
+                timeout=self.crew_timeout,
+                retries=self.crew_retries,
+            )
+
+        # Transform progressions from day-based to week-based structure, then keep
+        # week 1 once plus what each later week changes
+        logger.info("Transforming progressions to week-based structure...")
+        # compact_program matches days by letter; a crew's progressions keep their day's letter
+        weeks = [week_plan] + [
+            [progressions[week_idx].model_copy(update={"day": day_plan.day}) for day_plan, progressions in zip(week_plan, day_progressions)]
+            for week_idx in range(remaining_weeks)
+        ]
+        program = compact_program(weeks)
+        self.save_checkpoint("generate_weekly_progressions", program.model_dump(exclude_none=True))
+
+        logger.info("Full program generation completed")
+        return program
+
+    def summary_messages(self, program_digest: str) -> List[dict]:
+        plan_rationale = self.state.week_outline.rationale
+        return [
+            {
+                "role": "system",
+                "content": """
+                    As a personal trainer and coach with 20+ years of experience you've done multiple case studies on people 
+                    to deliver the most effective workouts and programs. You know how to help clients mitigate their risk of injury 
+                    and improve their quality of life. You are an expert at assessing the movement patterns of clients using the 
+                    Functional Movement Screen (FMS). You are able to analyze a client's fitness history, fms and physical readiness
+                    to generate appropriate exercise plans.
+                """
+            },
+            {
+                "role": "user",
+                "content": f"""
+                    Review the program below, the rationale for the program provided in {plan_rationale} 
+                    and the client's fitness history provided in {self.coach_notes}. Return a summary of the program as well as the rationale 
+                    for it in markdown format.
+
+                    Program (W = week, A/B/C = day, C1/C2 = circuit, RxS = rounds x rest):
+                    {program_digest}
+                """,
+            },
+        ]
+
+    def build_summary_prompt(self, program: CompactProgram) -> List[dict]:
+        """Summary prompt with the program digest trimmed to what's left of the token budget."""
+        overhead = count_tokens(self.model, self.summary_messages(""))
+        digest = fit_digest(program, self.model, settings.PROGRAM_SUMMARY_PROMPT_TOKENS - overhead)
+        return self.summary_messages(digest)
 
     @listen(generate_weekly_progressions)
-    def summarize_program(self, full_program: dict):
-        print("Summarizing program...")
+    async def summarize_program(self, program: CompactProgram):
+        logger.info("Summarizing program...")
         
-        plan_rationale = self.state.week_outline.rationale
-        response = completion(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": """
-                        As a personal trainer and coach with 20+ years of experience you've done multiple case studies on people 
-                        to deliver the most effective workouts and programs. You know how to help clients mitigate their risk of injury 
-                        and improve their quality of life. You are an expert at assessing the movement patterns of clients using the 
-                        Functional Movement Screen (FMS). You are able to analyze a client's fitness history, fms and physical readiness
-                        to generate appropriate exercise plans.
-                    """
-                },
-                {
-                    "role": "user",
-                    "content": f"""
-                        Review the program provided in {full_program}, the rationale for the program provided in {plan_rationale} 
-                        and the client's fitness history provided in {self.coach_notes}. Return a summary of the program as well as the rationale 
-                        for it in markdown format.
-                    """,
-                },
-            ],
+        messages = self.build_summary_prompt(program)
+        prompt_tokens = count_tokens(self.model, messages)
+        # Waits for room in the provider's budgets alongside every crew's LLM calls, then
+        # forwards tokens to the run's event channel as they arrive so the UI can render the summary live
+        publish_run_event({"type": "summary_started", "timestamp": time.time()})
+        chunks = []
+        async for token in llm_scheduler.astream(model=self.model, messages=messages):
+            chunks.append(token)
+            publish_run_event({"type": "summary_token", "token": token, "timestamp": time.time()})
+        program_summary = "".join(chunks)
+        completion_tokens = count_tokens(self.model, program_summary)
+        logger.info(
+            "Program summary for run %s: %d prompt tokens, %d completion tokens (%s)",
+            current_run_id.get() or DEFAULT_RUN_ID, prompt_tokens, completion_tokens, self.model,
         )
-        program_summary = response["choices"][0]["message"]["content"]
+        publish_run_event({
+            "type": "summary_completed",
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "timestamp": time.time(),
+        })
         self.state.program_summary = program_summary
-        return {
+        result = {
             "program_summary": program_summary,
-            "full_program": full_program
+            "program": program.model_dump(exclude_none=True)
         }
+        await asyncio.to_thread(program_cache.set, self.cache_key, result)
+        self.clear_checkpoints()
+        return result
 
 # Test FMS Inputs
 test_fms = FMS(
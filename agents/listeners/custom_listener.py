@@ -7,23 +7,162 @@ from crewai.utilities.events.agent_events import AgentExecutionCompletedEvent, A
 from crewai.utilities.events.task_events import TaskCompletedEvent, TaskStartedEvent
 from crewai.utilities.events.flow_events import FlowStartedEvent, FlowFinishedEvent, MethodExecutionStartedEvent, MethodExecutionFinishedEvent
 from crewai.utilities.events.base_event_listener import BaseEventListener
-from queue import Queue
-from typing import Dict, Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional
+import asyncio
+import threading
 import time
 
+# Channel used when a caller doesn't supply a run ID (matches the old single-queue behavior)
+DEFAULT_RUN_ID = "default"
+
+# The run that events emitted in the current context belong to. Crew kickoffs run in
+# worker threads via asyncio.to_thread, which copies the context, so crew/agent events
+# emitted inside a flow or request are attributed to the right run.
+current_run_id: ContextVar[Optional[str]] = ContextVar("current_run_id", default=None)
+
+class EventChannel:
+    def __init__(self, run_id: str, max_events: int):
+        self.run_id = run_id
+        self.max_events = max_events
+        # The current run's events so far, replayed to subscribers that connect after it started
+        self.backlog: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        # One queue per subscriber (SSE stream), so several can follow the same run
+        self.subscribers: List[asyncio.Queue] = []
+        # Runs currently bound to the channel (see EventChannels.bind)
+        self.publishers = 0
+        # The loop the channel was opened from; the backlog and queues are only touched there
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.last_active = time.time()
+
+    @property
+    def idle(self) -> bool:
+        return not self.subscribers and not self.publishers
+
+    def put(self, event: Dict[str, Any]) -> None:
+        """Deliver an event on the loop thread; a subscriber that doesn't keep up loses its oldest events."""
+        self.last_active = time.time()
+        self.backlog.append(event)
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+class EventChannels:
+    """
+    Registry of per-run event channels, keyed by flow/crew run ID.
+    Listener callbacks fire on whichever thread emitted the event; publish() hands each event
+    to the event loop, where it's kept in the channel's backlog and copied to every subscriber's
+    queue, so SSE generators can await the next event instead of polling. A subscriber that
+    connects while a run is in progress gets the run's events so far first.
+    """
+
+    def __init__(self, ttl: float = 10 * 60, max_events: int = 1000):
+        # Channels with no publisher or subscriber are dropped after `ttl` seconds without events
+        self.ttl = ttl
+        # A subscriber that stops reading loses its oldest events rather than holding on to all of them
+        self.max_events = max_events
+        self._channels: Dict[str, EventChannel] = {}
+        self._lock = threading.Lock()
+
+    def open(self, run_id: str) -> EventChannel:
+        """Get or create the channel for a run."""
+        channel = self._get_or_create(run_id)
+        self._attach_loop(channel)
+        self.sweep()
+        return channel
+
+    def subscribe(self, run_id: str) -> asyncio.Queue:
+        """A new queue of the run's events, starting with those of a run already in progress. Call from the loop."""
+        channel = self.open(run_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_events)
+        with self._lock:
+            # A finished run's events would end the stream before the next run with this ID starts
+            if channel.publishers:
+                for event in channel.backlog:
+                    queue.put_nowait(event)
+            channel.subscribers.append(queue)
+            channel.last_active = time.time()
+        return queue
+
+    def unsubscribe(self, run_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            channel = self._channels.get(run_id)
+            if channel is not None and queue in channel.subscribers:
+                channel.subscribers.remove(queue)
+                channel.last_active = time.time()
+
+    def publish(self, run_id: str, event: Dict[str, Any]) -> None:
+        with self._lock:
+            channel = self._channels.get(run_id)
+        loop = channel.loop if channel is not None else None
+        if loop is None:
+            # Nothing opened the channel from an event loop (e.g. a script), so nobody can be waiting
+            return
+        try:
+            loop.call_soon_threadsafe(channel.put, event)
+        except RuntimeError:
+            # The loop has shut down, so nobody is listening anymore
+            pass
+
+    def sweep(self) -> None:
+        """Drop channels nobody publishes to or reads from that have been quiet for `ttl` seconds."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for run_id in [run_id for run_id, channel in self._channels.items() if channel.idle and channel.last_active < cutoff]:
+                del self._channels[run_id]
+
+    @contextmanager
+    def bind(self, run_id: str):
+        """
+        Attribute every event emitted inside this block (and tasks/threads it starts) to `run_id`.
+        Starting a run replaces the backlog left by an earlier run with the same ID, but keeps
+        subscribers that connected before it started.
+        """
+        channel = self.open(run_id)
+        with self._lock:
+            if not channel.publishers:
+                channel.backlog.clear()
+            channel.publishers += 1
+            channel.last_active = time.time()
+        token = current_run_id.set(run_id)
+        try:
+            yield run_id
+        finally:
+            current_run_id.reset(token)
+            with self._lock:
+                channel.publishers -= 1
+                channel.last_active = time.time()
+
+    def _attach_loop(self, channel: EventChannel) -> None:
+        try:
+            channel.loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+
+    def _get_or_create(self, run_id: str) -> EventChannel:
+        with self._lock:
+            channel = self._channels.get(run_id)
+            if channel is None:
+                channel = self._channels[run_id] = EventChannel(run_id, self.max_events)
+            return channel
+
 class MyCustomListener(BaseEventListener):
-    def __init__(self):
+    def __init__(self, channels: EventChannels):
+        self.channels = channels
         super().__init__()
-        self.event_queue = Queue()
-        self.crew_id = None
-        self.flow_id = None
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Route an event to the channel of the run it was emitted in"""
+        self.channels.publish(current_run_id.get() or DEFAULT_RUN_ID, event)
 
     def setup_listeners(self, crewai_event_bus):
         @crewai_event_bus.on(CrewKickoffStartedEvent)
         def on_crew_started(source, event):
             print(f"Crew started: {event.crew_name}")
-            self.crew_id = event.crew_name
-            self.event_queue.put({
+            self.publish({
                 "type": "crew_started",
                 "crew_name": event.crew_name,
                 "timestamp": time.time()
@@ -32,7 +171,7 @@ class MyCustomListener(BaseEventListener):
         @crewai_event_bus.on(CrewKickoffCompletedEvent)
         def on_crew_completed(source, event):
             print(f"Crew completed: {event.crew_name}")
-            self.event_queue.put({
+            self.publish({
                 "type": "crew_completed",
                 "crew_name": event.crew_name,
                 # Convert to string to ensure JSON-serializable payloads
@@ -44,7 +183,7 @@ class MyCustomListener(BaseEventListener):
         @crewai_event_bus.on(AgentExecutionStartedEvent)
         def on_agent_execution_started(source, event):
             print(f"Agent started: {event.agent.role}")
-            self.event_queue.put({
+            self.publish({
                 "type": "agent_started",
                 "agent_role": event.agent.role,
                 "timestamp": time.time()
@@ -53,7 +192,7 @@ class MyCustomListener(BaseEventListener):
         @crewai_event_bus.on(AgentExecutionCompletedEvent)
         def on_agent_execution_completed(source, event):
             print(f"Agent completed: {event.agent.role}")
-            self.event_queue.put({
+            self.publish({
                 "type": "agent_completed",
                 "agent_role": event.agent.role,
                 # Convert to string to ensure JSON-serializable payloads
@@ -64,8 +203,7 @@ class MyCustomListener(BaseEventListener):
         @crewai_event_bus.on(FlowStartedEvent)
         def on_flow_started(source, event):
             print(f"Flow started: {event.flow_name}")
-            self.flow_id = event.flow_name
-            self.event_queue.put({
+            self.publish({
                 "type": "flow_started",
                 "flow_name": event.flow_name,
                 "timestamp": time.time()
@@ -74,7 +212,7 @@ class MyCustomListener(BaseEventListener):
         @crewai_event_bus.on(FlowFinishedEvent)
         def on_flow_finished(source, event):
             print(f"Flow finished: {event.flow_name}")
-            self.event_queue.put({
+            self.publish({
                 "type": "flow_finished",
                 "flow_name": event.flow_name,
                 # Convert to string to ensure JSON-serializable payloads
@@ -85,7 +223,7 @@ class MyCustomListener(BaseEventListener):
         @crewai_event_bus.on(MethodExecutionStartedEvent)
         def on_method_execution_started(source, event):
             print(f"Method started: {event.flow_name} - {event.method_name}")
-            self.event_queue.put({
+            self.publish({
                 "type": "method_started",
                 "flow_name": event.flow_name,
                 "method_name": event.method_name,
@@ -95,7 +233,7 @@ class MyCustomListener(BaseEventListener):
         @crewai_event_bus.on(MethodExecutionFinishedEvent)
         def on_method_execution_finished(source, event):
             print(f"Method finished: {event.flow_name} - {event.method_name}")
-            self.event_queue.put({
+            self.publish({
                 "type": "method_finished",
                 "flow_name": event.flow_name,
                 "method_name": event.method_name,
@@ -105,14 +243,10 @@ class MyCustomListener(BaseEventListener):
             })
 
 
-    def get_event(self):
-        """Get the next event from the queue if available"""
-        try:
-            return self.event_queue.get_nowait()
-        except:
-            return None
-
-    def clear_events(self):
-        """Clear all events from the queue"""
-        while not self.event_queue.empty():
-            self.event_queue.get()
\ No newline at end of file
+# One listener for the whole process; runs are separated by channel instead of by listener
+event_channels = EventChannels()
+event_listener = MyCustomListener(event_channels)
+
+def publish_run_event(event: Dict[str, Any]) -> None:
+    """Publish an app-level event (not a crewai one) to the run bound in the current context."""
+    event_channels.publish(current_run_id.get() or DEFAULT_RUN_ID, event)
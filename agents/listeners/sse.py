@@ -0,0 +1,56 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional
+
+from fastapi import Request
+
+from agents.core.config import settings
+from agents.listeners.custom_listener import EventChannels
+
+logger = logging.getLogger(__name__)
+
+async def stream_run_events(
+    channels: EventChannels,
+    run_id: str,
+    request: Request,
+    terminal_types: Iterable[str],
+    poll: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+    poll_interval: Optional[float] = None,
+) -> AsyncIterator[str]:
+    """
+    Yield a run's events as SSE messages until one of `terminal_types` arrives.
+    Waits on the channel instead of polling, sends a comment heartbeat when the run is quiet,
+    and stops as soon as the client goes away. Each stream has its own subscription to the
+    run's channel, dropped when the stream ends.
+
+    Runs that may execute in another process (whose events never reach this one's channels)
+    pass `poll`, called every `poll_interval` seconds while the channel is quiet; the
+    terminal event it returns, if any, is sent and ends the stream.
+    """
+    terminal_types = set(terminal_types)
+    wait = min(poll_interval or settings.SSE_HEARTBEAT_INTERVAL, settings.SSE_HEARTBEAT_INTERVAL)
+    last_write = time.monotonic()
+    queue = channels.subscribe(run_id)
+    try:
+        while True:
+            if await request.is_disconnected():
+                logger.info("SSE client for run %s disconnected", run_id)
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), wait)
+            except asyncio.TimeoutError:
+                event = poll() if poll is not None else None
+                if event is None:
+                    if time.monotonic() - last_write >= settings.SSE_HEARTBEAT_INTERVAL:
+                        # Keeps proxies from timing out the connection and surfaces dead clients on write
+                        last_write = time.monotonic()
+                        yield ": heartbeat\n\n"
+                    continue
+            last_write = time.monotonic()
+            yield f"data: {json.dumps(event)}\n\n"
+            if event["type"] in terminal_types:
+                break
+    finally:
+        channels.unsubscribe(run_id, queue)
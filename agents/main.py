@@ -1,11 +1,68 @@
-from fastapi import FastAPI, Header
+import time
+startup_started = time.perf_counter()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from copilotkit.integrations.fastapi import add_fastapi_endpoint
 from copilotkit import CopilotKitRemoteEndpoint, Action
+from agents.core.admission import AdmissionRejected, run_admission
+from agents.core.checkpoints import checkpoints
 from agents.core.config import settings
-from agents.routers import programs, workouts, exercises, flows
+from agents.core.database import database
+from agents.core.jobs import job_manager
+from agents.core.llm_scheduler import llm_scheduler
+from agents.core.registry import registry
+from agents.services.exercise_catalog import exercise_catalog
+from agents.services.program_service import purge_batch_exports
+from agents.routers import programs, workouts, exercises, flows, jobs
+
+# Uvicorn only configures its own loggers; without this the agents.* info logs are dropped
+logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logging.getLogger("agents").setLevel(settings.LOG_LEVEL)
+
+async def connect_database() -> None:
+    try:
+        await database.connect()
+    except Exception as e:
+        print(f"Database connection failed at startup: {e!r}")
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build crews and knowledge sources in the background so /health answers right away
+    warm_up_task = asyncio.create_task(registry.warm_up()) if settings.WARM_UP_ON_STARTUP else None
+    # One Prisma client and connection pool for every request, connected in the background
+    # too; /ready reports the database, and if it's down now the first request that needs
+    # it connects instead
+    connect_task = app.state.database_connect = asyncio.create_task(connect_database())
+    # Checkpoints of runs nobody resumed in time
+    checkpoints.purge(settings.CHECKPOINT_TTL)
+    # Batch exports nobody downloaded in time
+    purge_batch_exports()
+    # Background job workers; also take over jobs whose worker died (lease expired)
+    await job_manager.start()
+    print(f"App ready to serve in {time.perf_counter() - startup_started:.2f}s")
+    yield
+    await job_manager.stop()
+    if not connect_task.done():
+        connect_task.cancel()
+    await database.disconnect()
+    if warm_up_task and not warm_up_task.done():
+        warm_up_task.cancel()
+
+app = FastAPI(lifespan=lifespan)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    """At capacity: tell the client when to come back instead of queueing without bound."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -59,9 +116,31 @@ app.include_router(programs.router)
 app.include_router(workouts.router)
 app.include_router(exercises.router)
 app.include_router(flows.router)
+app.include_router(jobs.router)
 
 # add new route for health check
 @app.get("/health")
-def health():
-    """Health check."""
-    return {"status": "ok"}
\ No newline at end of file
+async def health():
+    """Liveness check; only in-process state, so it answers fast even when the database doesn't."""
+    return {
+        "status": "ok",
+        "components": registry.status(),
+        "build_times": registry.build_times,
+        "runs": run_admission.status(),
+        "llm": llm_scheduler.status(),
+        "database": {"connected": database.connected, "last_error": database.last_error, "reconnects": database.reconnects},
+        "exercise_catalog": exercise_catalog.status(),
+    }
+
+@app.get("/ready")
+async def ready():
+    """Readiness check: round-trips the database, answering 503 while it's down or still connecting."""
+    connect_task = getattr(app.state, "database_connect", None)
+    if connect_task is not None and not connect_task.done():
+        return JSONResponse(status_code=503, content={"status": "unavailable", "database": {"status": "connecting"}})
+    database_health = await database.health()
+    status = "ok" if database_health["status"] == "ok" else "unavailable"
+    return JSONResponse(
+        status_code=200 if status == "ok" else 503,
+        content={"status": status, "database": database_health},
+    )
\ No newline at end of file
@@ -0,0 +1,45 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, field_validator
+
+class ExerciseSearch(BaseModel):
+    """
+    Exercise search filters. List filters match exercises having any of the values;
+    filters combine with AND. Lists may also be sent as comma-joined strings.
+    """
+    q: Optional[str] = Field(default=None, description="Words that must all appear in the exercise name")
+    body: Optional[List[str]] = Field(default=None, description="Body focus, e.g. upper, lower, core, full")
+    plane: Optional[List[str]] = Field(default=None, description="Plane of motion, e.g. frontal, sagittal, transverse")
+    pattern: Optional[List[str]] = Field(default=None, description="Movement pattern, e.g. push, pull, squat, hinge, lunge")
+    equipment: Optional[List[str]] = Field(default=None, description="Equipment, e.g. bodyweight, dumbbell, kettlebell")
+    tags: Optional[List[str]] = Field(default=None, description="Free-form tags")
+    balance: Optional[List[str]] = Field(default=None, description="bilateral or unilateral")
+    balanceLevel: Optional[List[str]] = Field(default=None, description="static or dynamic")
+    contraction: Optional[List[str]] = Field(default=None, description="isometric or isotonic")
+    joint: Optional[List[str]] = Field(default=None, description="Joints involved")
+    lift: Optional[List[str]] = Field(default=None, description="compound or isolation")
+    muscles: Optional[List[str]] = Field(default=None, description="Muscle groups worked")
+    stretch: Optional[List[str]] = Field(default=None, description="static or dynamic stretch")
+    isFree: Optional[bool] = Field(default=None, description="Only free (true) or only paid (false) exercises")
+    limit: int = Field(default=50, ge=1, le=500, description="Most exercises to return")
+    cursor: Optional[str] = Field(default=None, description="next_cursor from the previous page")
+    fields: Optional[List[str]] = Field(default=None, description="Exercise fields to return; the default set if omitted")
+    counts: bool = Field(default=False, description="Include per-facet match counts")
+
+    @field_validator(
+        "body", "plane", "pattern", "equipment", "tags", "balance", "balanceLevel",
+        "contraction", "joint", "lift", "muscles", "stretch", "fields",
+        mode="before",
+    )
+    @classmethod
+    def split_comma_lists(cls, value: Any) -> Any:
+        if value is None:
+            return None
+        values = value if isinstance(value, list) else [value]
+        split = [part.strip() for item in values for part in str(item).split(",") if part.strip()]
+        return split or None
+
+class ExerciseSearchPage(BaseModel):
+    items: List[Dict[str, Any]] = Field(..., description="The matching exercises on this page, projected to the requested fields")
+    total: int = Field(..., description="Exercises matching the filters across all pages")
+    next_cursor: Optional[str] = Field(default=None, description="Pass as `cursor` for the next page; absent on the last page")
+    facets: Optional[Dict[str, Dict[str, int]]] = Field(default=None, description="Per facet, matches for each value given the other filters")
@@ -150,4 +150,7 @@ class GenerateProgramInput(BaseModel):
     activeStraightLegRaise: int = Field(..., description="The client's active straight leg raise score")
     trunkStabilityPushUp: int = Field(..., description="The client's trunk stability push-up score")
     rotaryStability: int = Field(..., description="The client's rotary stability score")
-    coachNotes: str = Field(..., description="The coach's notes for the program")
\ No newline at end of file
+    coachNotes: str = Field(..., description="The coach's notes for the program")
+
+class BatchProgramInput(GenerateProgramInput):
+    client: Optional[str] = Field(default=None, description="A label for the client (name, roster ID, ...) echoed back with their program")
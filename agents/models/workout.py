@@ -1,6 +1,6 @@
 from enum import Enum
-from typing import List, Optional
-from pydantic import BaseModel, EmailStr, Field
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, EmailStr, Field, model_serializer
 from agents.models.movement import ExerciseType
 
 class WorkoutLocation(str, Enum):
@@ -42,6 +42,7 @@ class MovementPrep(BaseModel):
 
 class ExerciseSet(BaseModel):
     name: str = Field(..., description="The exercise to be performed")
+    exercise_id: Optional[str] = Field(default=None, description="The id of the exercise in the exercise library, when it was picked from there")
     reps: int = Field(..., description="The number of repetitions to perform the exercise")
     rpe: int = Field(..., description="The relative intensity of the exercise")
 
@@ -59,4 +60,46 @@ class WorkoutPlan(BaseModel):
     finisher: str = Field(..., description="The finisher for the workout")
 
 class WorkoutProgressions(BaseModel):
-    progressions: List[WorkoutPlan] = Field(..., description="The list of progressed workout plans")
\ No newline at end of file
+    progressions: List[WorkoutPlan] = Field(..., description="The list of progressed workout plans")
+
+# Compact program: the base week once, then only what each later week changes
+class ExerciseDelta(BaseModel):
+    index: int = Field(..., description="Position of the exercise in its circuit")
+    name: Optional[str] = Field(default=None, description="The exercise variant, when it changes")
+    exercise_id: Optional[str] = Field(default=None, description="The library id of the new variant, if it has one")
+    reps: Optional[int] = Field(default=None, description="The repetitions, when they change")
+    rpe: Optional[int] = Field(default=None, description="The relative intensity, when it changes")
+
+    # Only the fields a delta sets are serialized, whatever the dump options, and a field
+    # set to None (e.g. a cleared exercise_id) is kept; reloading gives back the same changes
+    @model_serializer(mode="wrap")
+    def _serialize_set_fields(self, handler) -> Dict[str, Any]:
+        data = handler(self)
+        return {field: data.get(field) for field in type(self).model_fields if field == "index" or field in self.model_fields_set}
+
+    def changes(self) -> Dict[str, Any]:
+        """The exercise fields this delta sets, including any it sets to None."""
+        return {field: getattr(self, field) for field in self.model_fields_set if field != "index"}
+
+class CircuitDelta(BaseModel):
+    rounds: Optional[int] = Field(default=None, description="The number of rounds, when it changes")
+    rest: Optional[int] = Field(default=None, description="The rest between rounds, when it changes")
+    exercises: List[ExerciseDelta] = Field(default_factory=list, description="Changes to individual exercises")
+    circuit: Optional[Circuit] = Field(default=None, description="The whole circuit, when its exercises were added or removed")
+
+class DayDelta(BaseModel):
+    day: str = Field(..., description="The day of the base week this changes")
+    power: Optional[str] = None
+    circuit_1: Optional[CircuitDelta] = None
+    circuit_2: Optional[CircuitDelta] = None
+    # Identical every week by design; only set if a progression changed them anyway
+    movement_prep: Optional[List[MovementPrep]] = None
+    finisher: Optional[str] = None
+
+class WeekDelta(BaseModel):
+    week: int = Field(..., description="The week number, starting at 2")
+    days: List[DayDelta] = Field(default_factory=list, description="The days that differ from the base week")
+
+class CompactProgram(BaseModel):
+    base_week: List[WorkoutPlan] = Field(..., description="Week 1, in full")
+    weeks: List[WeekDelta] = Field(default_factory=list, description="Weeks 2..N as changes to week 1")
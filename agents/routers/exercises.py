@@ -1,6 +1,8 @@
-from typing import Annotated, Optional
-from fastapi import APIRouter, Form
-from pydantic import BaseModel
+from typing import Annotated
+from fastapi import APIRouter, Depends, Form, HTTPException
+from prisma import Prisma
+from agents.core.database import get_prisma
+from agents.models.exercise import ExerciseSearch, ExerciseSearchPage
 from agents.services.exercise_service import get_exercise_by_id, search_exercises
 
 router = APIRouter(
@@ -9,21 +11,19 @@ router = APIRouter(
 )
 
 @router.get("/{exercise_id}")
-async def get_exercise(exercise_id: str):
-    exercise = await get_exercise_by_id(exercise_id)
+async def get_exercise(exercise_id: str, prisma: Annotated[Prisma, Depends(get_prisma)]):
+    exercise = await get_exercise_by_id(prisma, exercise_id)
     return exercise
 
-class SearchExercisesRequest(BaseModel):
-    body: Optional[str] = None
-    plane: Optional[str] = None
-    pattern: Optional[str] = None
-
 @router.post("/search")
-async def search_exercises_endpoint(data: Annotated[SearchExercisesRequest, Form()]):
-    body_list = data.body.split(',') if data.body else None
-    plane_list = data.plane.split(',') if data.plane else None
-    pattern_list = data.pattern.split(',') if data.pattern else None
-
-    print(f"Searching for exercises with body: {body_list}, plane: {plane_list}, pattern: {pattern_list}")
-    exercises = await search_exercises(body_list, plane_list, pattern_list)
-    return exercises
\ No newline at end of file
+async def search_exercises_endpoint(search: Annotated[ExerciseSearch, Form()], prisma: Annotated[Prisma, Depends(get_prisma)]) -> ExerciseSearchPage:
+    """
+    Faceted exercise search. Form fields take comma-joined values (e.g. body=upper,lower),
+    `fields` trims each exercise to the named columns and `counts` adds per-facet counts.
+    Page through results by passing `next_cursor` back as `cursor`.
+    """
+    print(f"Searching for exercises with {search.model_dump(exclude_none=True)}")
+    try:
+        return await search_exercises(prisma, search)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
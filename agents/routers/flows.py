@@ -1,5 +1,6 @@
 import time
 from fastapi import APIRouter
+from agents.core.admission import run_admission
 from agents.flows.example_flow import ExampleFlow
 
 router = APIRouter(
@@ -11,7 +12,8 @@ router = APIRouter(
 async def run_example_flow():
     start_time = time.perf_counter()
     flow = ExampleFlow()
-    result = await flow.kickoff_async()
+    async with run_admission.admit():
+        result = await flow.kickoff_async()
     process_time = time.perf_counter() - start_time
     return {
         "process_time": process_time,
@@ -0,0 +1,71 @@
+import asyncio
+import json
+from typing import Annotated, Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from agents.core.jobs import FINISHED_STATUSES, JOB_TERMINAL_EVENTS, Job, JobStatus, job_manager
+from agents.core.compact_program import expand_result
+from agents.core.program_export import convert_program_to_excel, excel_response
+from agents.listeners.custom_listener import event_channels
+from agents.listeners.sse import stream_run_events
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"]
+)
+
+def get_job_or_404(job_id: str) -> Job:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Status of a job, plus its result once it has succeeded"""
+    return get_job_or_404(job_id)
+
+def finished_event(job: Optional[Job]) -> Optional[dict]:
+    """The terminal event for a finished job, read from the store; None while it's still queued or running."""
+    if job is None or job.status not in FINISHED_STATUSES:
+        return None
+    return {"type": f"job_{job.status.value}", "job_id": job.id, "error": job.error, "timestamp": job.finished_at}
+
+@router.get("/{job_id}/events")
+async def get_job_events(job_id: str, request: Request):
+    """SSE stream of one job's flow/crew events, ending with job_succeeded or job_failed"""
+    event = finished_event(get_job_or_404(job_id))
+    if event is not None:
+        # Nothing left to wait for; report the outcome and end the stream
+        async def finished():
+            yield f"data: {json.dumps(event)}\n\n"
+        return StreamingResponse(finished(), media_type="text/event-stream")
+    return StreamingResponse(
+        stream_run_events(
+            event_channels,
+            job_id,
+            request,
+            terminal_types=JOB_TERMINAL_EVENTS,
+            # The job may be running in another process, whose events never reach this one;
+            # its outcome still lands in the shared job store
+            poll=lambda: finished_event(job_manager.get(job_id)),
+            poll_interval=job_manager.poll_interval,
+        ),
+        media_type="text/event-stream",
+    )
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str, format: Annotated[Literal["json", "excel"], Query()] = "json", expand: Annotated[bool, Query()] = False):
+    """The stored result of a finished job, as JSON (compact program unless `expand` is set) or as the program Excel export"""
+    job = get_job_or_404(job_id)
+    if job.status == JobStatus.failed:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} failed: {job.error}")
+    if job.status != JobStatus.succeeded:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status.value}")
+    if format == "excel":
+        excel_buffer = await asyncio.to_thread(convert_program_to_excel, job.result["result"])
+        return excel_response(excel_buffer, f"fitness_program_{job.id}.xlsx")
+    if expand:
+        return {**job.result, "result": expand_result(job.result["result"])}
+    return job.result
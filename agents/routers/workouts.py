@@ -1,44 +1,33 @@
 import time
 from typing import Annotated
-from fastapi import APIRouter, Form
+from fastapi import APIRouter, Form, Query, Request
 from fastapi.responses import StreamingResponse
-import asyncio
-import json
 
 from agents.models.workout import GenerateWorkoutInput
-from agents.crews.generate_workout_crew.generate_workout_crew import my_listener, GenerateWorkoutCrew, movement_patterns, movement_plane, balance_type
+from agents.crews.generate_workout_crew.generate_workout_crew import movement_patterns, movement_plane, balance_type
+from agents.core.admission import run_admission
+from agents.core.concurrency import kickoff_crew
+from agents.core.registry import registry
+from agents.listeners.custom_listener import DEFAULT_RUN_ID, event_channels
+from agents.listeners.sse import stream_run_events
 
 router = APIRouter(
     prefix="/workouts",
     tags=["workouts"]
 )
 
-async def event_generator():
-    """Generate SSE events from the listener queue"""
-    while True:
-        event = my_listener.get_event()
-        if event:
-            if event["type"] == "crew_completed":
-                yield f"data: {json.dumps(event)}\n\n"
-                break
-            yield f"data: {json.dumps(event)}\n\n"
-        await asyncio.sleep(0.1)
-
 @router.get("/generate_workout/events")
-async def get_crew_events():
+async def get_crew_events(request: Request, run_id: Annotated[str, Query()] = DEFAULT_RUN_ID):
     """SSE endpoint for getting crew execution events"""
     return StreamingResponse(
-        event_generator(),
+        stream_run_events(event_channels, run_id, request, terminal_types=["crew_completed"]),
         media_type="text/event-stream"
     )
 
 @router.post("/generate_workout")
-async def getGeneratedWorkout(workoutInput: Annotated[GenerateWorkoutInput, Form()]):
+async def getGeneratedWorkout(workoutInput: Annotated[GenerateWorkoutInput, Form()], run_id: Annotated[str, Query()] = DEFAULT_RUN_ID):
     start_time = time.perf_counter()
     
-    # Clear any previous events
-    my_listener.clear_events()
-    
     # Prepare inputs
     crew_inputs = {
       'workout_input': workoutInput.model_dump(),
@@ -47,12 +36,10 @@ async def getGeneratedWorkout(workoutInput: Annotated[GenerateWorkoutInput, Form
       'balance_type': balance_type,
     }
 
-    generate_workout_crew = GenerateWorkoutCrew().crew()
-    
-    # Start the crew execution
-    result = await generate_workout_crew.kickoff_async(
-        inputs=crew_inputs
-    )
+    # Wait for (or get refused) a run slot, then start the crew execution with its events routed to this run's channel
+    async with run_admission.admit():
+        with event_channels.bind(run_id):
+            result = await kickoff_crew(registry.get("generate_workout_crew").copy(), crew_inputs)
     raw_output = result.raw
     # pydantic_output = result.pydantic.model_dump()
     process_time = time.perf_counter() - start_time
@@ -0,0 +1,211 @@
+import asyncio
+import time
+from bisect import bisect_right
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypedDict
+
+from prisma import Prisma
+
+from agents.core.config import settings
+
+# Columns with an inverted index: every filterable column of Exercise. The schema has
+# no angle column, so there is no angle facet
+FACETS = (
+    "body", "plane", "pattern", "equipment", "tags", "balance", "balanceLevel",
+    "contraction", "joint", "lift", "muscles", "stretch", "isFree",
+)
+# Scalar columns a search can project; relations aren't loaded
+EXERCISE_FIELDS = (
+    "id", "name", "description", "isFree", "cues", "tips", "youtubeLink", "s3ImageKey", "s3VideoKey",
+    "muxPlaybackId", "tags", "balance", "balanceLevel", "body", "contraction", "equipment", "joint",
+    "lift", "muscles", "pattern", "plane", "stretch", "createdAt", "updatedAt",
+)
+
+CatalogVersion = Tuple[Optional[datetime], int]
+# (name, id) of the last exercise on a page; the catalog is sorted on it
+CursorKey = Tuple[str, str]
+
+class ExerciseRead(TypedDict):
+    id: str
+    name: str
+    description: str
+    cues: list[str]
+    tips: Optional[list[str]]
+    tags: Optional[list[str]]
+    body: Optional[list[str]]
+    equipment: Optional[list[str]]
+    plane: Optional[list[str]]
+    pattern: Optional[list[str]]
+    balance: Optional[str]
+
+# What a search returns when it doesn't ask for specific fields
+DEFAULT_FIELDS = tuple(ExerciseRead.__annotations__)
+
+def _facet_value(item: Any) -> str:
+    if isinstance(item, Enum):
+        return item.value
+    if isinstance(item, bool):
+        return "true" if item else "false"
+    return str(item)
+
+def _facet_values(value: Any) -> List[str]:
+    if value is None:
+        return []
+    values = value if isinstance(value, list) else [value]
+    return [_facet_value(item) for item in values]
+
+def _iter_bits(bits: int) -> Iterator[int]:
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+class ExerciseIndex:
+    """
+    Immutable snapshot of the exercise library, sorted by (name, id). Each facet
+    maps a value to a bitset (an int) of exercise positions, so filtering is a
+    few ORs and ANDs and counting is a popcount.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], version: CatalogVersion):
+        self.records = sorted(records, key=lambda record: (record["name"], record["id"]))
+        self.version = version
+        self.keys: List[CursorKey] = [(record["name"], record["id"]) for record in self.records]
+        self.lower_names = [record["name"].lower() for record in self.records]
+        self.all_bits = (1 << len(self.records)) - 1
+        self.indexes: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        for position, record in enumerate(self.records):
+            bit = 1 << position
+            for facet in FACETS:
+                index = self.indexes[facet]
+                for value in _facet_values(record.get(facet)):
+                    index[value] = index.get(value, 0) | bit
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any], version: CatalogVersion) -> "ExerciseIndex":
+        return cls([{field: getattr(row, field, None) for field in EXERCISE_FIELDS} for row in rows], version)
+
+    def text_bits(self, q: Optional[str]) -> int:
+        """Exercises whose name contains every word of `q` (case-insensitive)."""
+        words = (q or "").lower().split()
+        if not words:
+            return self.all_bits
+        bits = 0
+        for position, name in enumerate(self.lower_names):
+            if all(word in name for word in words):
+                bits |= 1 << position
+        return bits
+
+    def facet_bits(self, facet: str, values: Optional[List[str]]) -> Optional[int]:
+        """Exercises with any of `values` for the facet (Postgres `has_some`); None if the facet doesn't filter."""
+        values = [value for value in values or [] if value]
+        if not values:
+            return None
+        index = self.indexes[facet]
+        bits = 0
+        for value in values:
+            bits |= index.get(value, 0)
+        return bits
+
+    def match(self, q: Optional[str] = None, **facets: Optional[List[str]]) -> int:
+        """
+        Bitset of exercises matching `q` and every given facet, each on any of its
+        values. Facets that are None or hold only empty values don't filter.
+        """
+        bits = self.text_bits(q)
+        for facet, values in facets.items():
+            facet_bits = self.facet_bits(facet, values)
+            if facet_bits is not None:
+                bits &= facet_bits
+            if not bits:
+                break
+        return bits
+
+    def facet_counts(self, q: Optional[str] = None, **facets: Optional[List[str]]) -> Dict[str, Dict[str, int]]:
+        """
+        Matches per value of every facet. Each facet is counted against the other
+        filters only, so the counts say what picking another value would return.
+        """
+        text_bits = self.text_bits(q)
+        filters = {facet: bits for facet, values in facets.items() if (bits := self.facet_bits(facet, values)) is not None}
+        counts = {}
+        for facet in FACETS:
+            bits = text_bits
+            for other, other_bits in filters.items():
+                if other != facet:
+                    bits &= other_bits
+            counts[facet] = {
+                value: count
+                for value, value_bits in sorted(self.indexes[facet].items())
+                if (count := (bits & value_bits).bit_count())
+            }
+        return counts
+
+    def page(self, bits: int, limit: int, after: Optional[CursorKey] = None) -> Tuple[List[int], Optional[CursorKey]]:
+        """Positions of up to `limit` matches after the cursor key, and the key to continue from if more remain."""
+        if after is not None:
+            bits &= ~((1 << bisect_right(self.keys, tuple(after))) - 1)
+        positions = []
+        for position in _iter_bits(bits):
+            if len(positions) == limit:
+                return positions, self.keys[positions[-1]]
+            positions.append(position)
+        return positions, None
+
+    def project(self, position: int, fields: Iterable[str] = DEFAULT_FIELDS) -> Dict[str, Any]:
+        record = self.records[position]
+        return {field: record[field] for field in fields}
+
+class ExerciseCatalog:
+    """
+    Read-through, process-local copy of the Exercise table. Loaded on first use;
+    afterwards, at most every `check_interval` seconds, a request compares the
+    table's max(updatedAt) and row count with the snapshot's and reloads if
+    either moved.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._index: Optional[ExerciseIndex] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self, prisma: Prisma) -> ExerciseIndex:
+        index = self._index
+        if index is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return index
+        # One request checks/reloads while concurrent ones wait for its snapshot
+        async with self._lock:
+            if self._index is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._index
+            version = await self._version(prisma)
+            if self._index is None or self._index.version != version:
+                self._index = await self._load(prisma, version)
+            self._checked_at = time.monotonic()
+            return self._index
+
+    def status(self) -> Dict[str, Any]:
+        index = self._index
+        if index is None:
+            return {"loaded": False}
+        updated_at = index.version[0]
+        return {"loaded": True, "exercises": len(index.records), "updated_at": updated_at, "checked_seconds_ago": round(time.monotonic() - self._checked_at, 1)}
+
+    @staticmethod
+    async def _version(prisma: Prisma) -> CatalogVersion:
+        latest, count = await asyncio.gather(
+            prisma.exercise.find_first(order={"updatedAt": "desc"}),
+            prisma.exercise.count(),
+        )
+        return (latest.updatedAt if latest else None, count)
+
+    @staticmethod
+    async def _load(prisma: Prisma, version: CatalogVersion) -> ExerciseIndex:
+        start_time = time.perf_counter()
+        rows = await prisma.exercise.find_many()
+        index = ExerciseIndex.from_rows(rows, version)
+        print(f"Loaded exercise catalog ({len(index.records)} exercises) in {time.perf_counter() - start_time:.2f}s")
+        return index
+
+exercise_catalog = ExerciseCatalog(check_interval=settings.EXERCISE_CATALOG_CHECK_INTERVAL)
@@ -1,52 +1,51 @@
+import base64
+import json
+
 from prisma import Prisma
-from typing import TypedDict, Optional
-
-class ExerciseRead(TypedDict):
-    id: str
-    name: str
-    description: str
-    cues: list[str]
-    tips: Optional[list[str]]
-    tags: Optional[list[str]]
-    body: Optional[list[str]]
-    equipment: Optional[list[str]]
-    plane: Optional[list[str]]
-    pattern: Optional[list[str]]
-
-async def get_exercise_by_id(exercise_id: str) -> dict | None:
+
+from agents.models.exercise import ExerciseSearch, ExerciseSearchPage
+from agents.services.exercise_catalog import DEFAULT_FIELDS, EXERCISE_FIELDS, FACETS, CursorKey, exercise_catalog
+
+async def get_exercise_by_id(prisma: Prisma, exercise_id: str) -> dict | None:
     """
     Get an exercise by its ID.
+    `prisma` is the shared, already connected client (see agents.core.database).
     """
-    async with Prisma() as prisma:
-        exercise = await prisma.exercise.find_unique(where={"id": exercise_id})
-        return exercise
+    exercise = await prisma.exercise.find_unique(where={"id": exercise_id})
+    return exercise
 
+def encode_cursor(key: CursorKey) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
 
-async def search_exercises(body: list[str] = None, plane: list[str] = None, pattern: list[str] = None) -> list[ExerciseRead]:
-    # TODO: Update to include angle and balance
+def decode_cursor(cursor: str) -> CursorKey:
+    try:
+        name, exercise_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (str(name), str(exercise_id))
+    except Exception:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+
+async def search_exercises(prisma: Prisma, search: ExerciseSearch) -> ExerciseSearchPage:
     """
-    Search for exercises based on body focus, plane of motion, and movement patterns.
-    Only includes parameters in the query if they are present and non-empty.
+    Search exercises on any facet of the Exercise model plus words in the name.
+    Answered from the in-memory exercise catalog; `prisma` is only used to (re)load it.
+    Raises ValueError for unknown fields or a malformed cursor.
     """
-    print(f"Searching for exercises with body: {body}, plane: {plane}, pattern: {pattern}")
-    async with Prisma() as prisma:
-        where_conditions = {}
-        if body and any(body):
-            where_conditions["body"] = {"has_some": body}
-        if plane and any(plane):
-            where_conditions["plane"] = {"has_some": plane}
-        if pattern and any(pattern):
-            where_conditions["pattern"] = {"has_some": pattern}
-        exercises = await prisma.exercise.find_many(where=where_conditions)
-        return [ExerciseRead(
-            id=exercise.id,
-            name=exercise.name,
-            description=exercise.description,
-            cues=exercise.cues,
-            tips=exercise.tips,
-            tags=exercise.tags,
-            body=exercise.body,
-            equipment=exercise.equipment,
-            plane=exercise.plane,
-            pattern=exercise.pattern,
-        ) for exercise in exercises]
\ No newline at end of file
+    fields = search.fields or DEFAULT_FIELDS
+    unknown = [field for field in fields if field not in EXERCISE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown exercise fields: {', '.join(unknown)}")
+    after = decode_cursor(search.cursor) if search.cursor else None
+
+    facets = {facet: getattr(search, facet) for facet in FACETS}
+    if search.isFree is not None:
+        facets["isFree"] = ["true" if search.isFree else "false"]
+
+    catalog = await exercise_catalog.get(prisma)
+    bits = catalog.match(search.q, **facets)
+    positions, next_key = catalog.page(bits, search.limit, after)
+    return ExerciseSearchPage(
+        items=[catalog.project(position, fields) for position in positions],
+        total=bits.bit_count(),
+        next_cursor=encode_cursor(next_key) if next_key else None,
+        facets=catalog.facet_counts(search.q, **facets) if search.counts else None,
+    )
@@ -0,0 +1,266 @@
+"""
+Program generation for a whole roster (a team, a wellness cohort, ...) at once.
+
+Clients whose FMS scores and coach notes are the same share one flow run, distinct runs
+go at most `concurrency` at a time, and each client's result is yielded as soon as
+their run finishes. Runs in the same process also share crew stages: a stage already
+in the cache is reused, and identical stages running at the same time share one crew
+kickoff. Once every run has finished, all programs are bundled into one zip of Excel
+workbooks, kept under BATCH_EXPORT_DIR for BATCH_EXPORT_TTL.
+
+    python -m agents.services.program_service roster.csv --output roster.zip
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import re
+import time
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from agents.core.admission import run_admission
+from agents.core.compact_program import expand_result
+from agents.core.config import settings
+from agents.core.program_export import convert_program_to_excel
+from agents.flows.generate_program_flow.generate_program_flow import GenerateProgramFlow, ProgressionMode, program_cache_key
+from agents.listeners.custom_listener import DEFAULT_RUN_ID, event_channels
+from agents.models.program import BatchProgramInput
+
+ROSTER_FORMATS = ("json", "jsonl", "csv")
+
+def fms_from_program_input(program_input: dict) -> dict:
+    """Map the form's camelCase FMS scores to the flow's FMS fields."""
+    fms_input = {
+        'deep_squat': program_input['deepSquat'],
+        'hurdle_step': program_input['hurdleStep'],
+        'inline_lunge': program_input['inlineLunge'],
+        'shoulder_mobility': program_input['shoulderMobility'],
+        'active_straight_leg_raise': program_input['activeStraightLegRaise'],
+        'trunk_stability_pushup': program_input['trunkStabilityPushUp'],
+        'rotary_stability': program_input['rotaryStability'],
+    }
+    fms_input['total_score'] = sum(fms_input.values())
+    return fms_input
+
+def roster_format(filename: str) -> str:
+    """The roster format from a file name's extension."""
+    format = Path(filename or "").suffix.lstrip(".").lower()
+    if format not in ROSTER_FORMATS:
+        raise ValueError(f"Unsupported roster file '{filename}'. Use one of: {', '.join(ROSTER_FORMATS)}")
+    return format
+
+def parse_roster(content: str, format: str) -> List[BatchProgramInput]:
+    """
+    Read a roster of GenerateProgramInput records (plus an optional `client` label) from a
+    JSON list, JSON lines or CSV with the fields as column headers.
+    Raises ValueError naming the first bad record.
+    """
+    try:
+        if format == "json":
+            records = json.loads(content)
+            if not isinstance(records, list):
+                raise ValueError("A JSON roster must be a list of records")
+        elif format == "jsonl":
+            records = [json.loads(line) for line in content.splitlines() if line.strip()]
+        elif format == "csv":
+            # Blank cells are missing values, so an empty client label stays unset
+            records = [{key: value for key, value in row.items() if value not in (None, "")} for row in csv.DictReader(io.StringIO(content))]
+        else:
+            raise ValueError(f"Unknown roster format '{format}'. Use one of: {', '.join(ROSTER_FORMATS)}")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in roster: {e}")
+    clients = []
+    for number, record in enumerate(records, 1):
+        try:
+            clients.append(BatchProgramInput.model_validate(record))
+        except ValidationError as e:
+            raise ValueError(f"Roster record {number} is invalid: {e}")
+    return clients
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-")[:40]
+
+class ProgramBatch:
+    """One roster's program generation. Iterate `run()` once; `export()` afterwards."""
+
+    def __init__(
+        self,
+        clients: List[BatchProgramInput],
+        refresh: bool = False,
+        progression_mode: Optional[ProgressionMode] = None,
+        concurrency: Optional[int] = None,
+        run_id: str = DEFAULT_RUN_ID,
+    ):
+        if not clients:
+            raise ValueError("The roster is empty")
+        if len(clients) > settings.BATCH_MAX_CLIENTS:
+            raise ValueError(f"The roster has {len(clients)} clients; the limit is {settings.BATCH_MAX_CLIENTS}")
+        self.id = uuid.uuid4().hex
+        self.clients = clients
+        self.concurrency = concurrency or settings.BATCH_MAX_CONCURRENCY
+        # Every flow in the batch publishes its events to this channel
+        self.run_id = run_id
+        # One flow per distinct program cache key, and the clients (by roster index) it serves
+        self.flows: Dict[str, GenerateProgramFlow] = {}
+        self.members: Dict[str, List[int]] = {}
+        for index, client in enumerate(clients):
+            program_input = client.model_dump()
+            fms = fms_from_program_input(program_input)
+            key = program_cache_key(fms, program_input['coachNotes'], progression_mode)
+            if key not in self.flows:
+                self.flows[key] = GenerateProgramFlow(
+                    fms=fms,
+                    coach_notes=program_input['coachNotes'],
+                    refresh=refresh,
+                    progression_mode=progression_mode,
+                )
+            self.members.setdefault(key, []).append(index)
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.process_times: Dict[str, float] = {}
+
+    def label(self, index: int) -> str:
+        return self.clients[index].client or f"client {index + 1}"
+
+    async def _run_flow(self, key: str) -> str:
+        flow = self.flows[key]
+        start_time = time.perf_counter()
+        try:
+            # Each run still takes a run slot, so a batch can't crowd out interactive requests.
+            # It waits for one past the queue limit: the semaphore in run() bounds how many it queues.
+            async with run_admission.admit(wait=True):
+                with event_channels.bind(self.run_id):
+                    self.results[key] = await flow.kickoff_async()
+        except Exception as e:
+            self.errors[key] = repr(e)
+        self.process_times[key] = time.perf_counter() - start_time
+        return key
+
+    async def run(self) -> AsyncIterator[Dict[str, Any]]:
+        """A `client_result` per client in completion order; clients sharing a run arrive together."""
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def bounded(key: str) -> str:
+            async with semaphore:
+                return await self._run_flow(key)
+
+        tasks = [asyncio.create_task(bounded(key)) for key in self.flows]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                key = await next_done
+                flow = self.flows[key]
+                first, *_ = self.members[key]
+                for index in self.members[key]:
+                    item = {
+                        "type": "client_result",
+                        "index": index,
+                        "client": self.label(index),
+                        # Identical inputs earlier in the roster; this client got the same program
+                        "duplicate_of": first if index != first else None,
+                        "cached": flow.cache_hit,
+                        "process_time": self.process_times[key],
+                    }
+                    if key in self.errors:
+                        item["error"] = self.errors[key]
+                    else:
+                        item["result"] = self.results[key]
+                    yield item
+        finally:
+            # The consumer went away (e.g. the client disconnected); stop the remaining runs
+            for task in tasks:
+                task.cancel()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "type": "batch_completed",
+            "batch_id": self.id,
+            "clients": len(self.clients),
+            "runs": len(self.flows),
+            "cached_runs": sum(flow.cache_hit for flow in self.flows.values()),
+            "failed_clients": sum(len(self.members[key]) for key in self.errors),
+        }
+
+    def export(self) -> bytes:
+        """A zip with one Excel workbook per client that got a program, plus an index of the roster."""
+        # Clients sharing a run share its workbook, so each program is rendered once
+        workbooks: Dict[str, bytes] = {}
+        run_of = {index: key for key, indexes in self.members.items() for index in indexes}
+        index_rows = []
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for index in range(len(self.clients)):
+                key = run_of[index]
+                row = {"index": index, "client": self.label(index), "file": None, "error": self.errors.get(key)}
+                if key in self.results:
+                    if key not in workbooks:
+                        workbooks[key] = convert_program_to_excel(self.results[key]).getvalue()
+                    row["file"] = f"{index + 1:03d}-{_slug(self.label(index))}.xlsx"
+                    archive.writestr(row["file"], workbooks[key])
+                index_rows.append(row)
+            archive.writestr("roster.json", json.dumps(index_rows, indent=2))
+        return buffer.getvalue()
+
+def purge_batch_exports(older_than: float = settings.BATCH_EXPORT_TTL) -> int:
+    """Delete batch exports written more than `older_than` seconds ago."""
+    export_dir = Path(settings.BATCH_EXPORT_DIR)
+    if not export_dir.is_dir():
+        return 0
+    cutoff = time.time() - older_than
+    removed = 0
+    for path in export_dir.glob("*.zip"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            # Another worker purged it first
+            pass
+    return removed
+
+def batch_export_path(batch_id: str) -> Path:
+    if not re.fullmatch(r"[0-9a-f]{32}", batch_id):
+        raise ValueError(f"Invalid batch ID '{batch_id}'")
+    return Path(settings.BATCH_EXPORT_DIR) / f"{batch_id}.zip"
+
+async def stream_batch(batch: ProgramBatch, expand: bool = False) -> AsyncIterator[str]:
+    """NDJSON for the batch endpoints: each client's result, then the summary with where to get the export."""
+    async for item in batch.run():
+        if expand and "result" in item:
+            item["result"] = expand_result(item["result"])
+        yield json.dumps(item, default=str) + "\n"
+    path = batch_export_path(batch.id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    await asyncio.to_thread(purge_batch_exports)
+    path.write_bytes(await asyncio.to_thread(batch.export))
+    yield json.dumps({**batch.summary(), "export_url": f"/programs/program_flow/batch/{batch.id}/export"}) + "\n"
+
+async def run_batch_cli(args: argparse.Namespace) -> None:
+    roster = Path(args.roster)
+    batch = ProgramBatch(
+        parse_roster(roster.read_text(encoding="utf-8-sig"), roster_format(roster.name)),
+        refresh=args.refresh,
+        progression_mode=args.progression_mode,
+        concurrency=args.concurrency,
+    )
+    print(f"{len(batch.clients)} clients, {len(batch.flows)} distinct programs to generate", flush=True)
+    async for item in batch.run():
+        # Programs go to the export; stdout just tracks progress
+        print(json.dumps({key: value for key, value in item.items() if key != "result"}), flush=True)
+    output = Path(args.output or roster.with_suffix(".zip"))
+    output.write_bytes(await asyncio.to_thread(batch.export))
+    print(json.dumps({**batch.summary(), "export": str(output)}), flush=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate programs for every client in a roster file (json, jsonl or csv)")
+    parser.add_argument("roster")
+    parser.add_argument("--output", help="Where to write the zip of workbooks (default: next to the roster)")
+    parser.add_argument("--concurrency", type=int, default=settings.BATCH_MAX_CONCURRENCY)
+    parser.add_argument("--progression-mode", choices=["rules", "creative"])
+    parser.add_argument("--refresh", action="store_true", help="Regenerate instead of using cached programs")
+    asyncio.run(run_batch_cli(parser.parse_args()))
@@ -0,0 +1,12 @@
+import os
+import tempfile
+
+# Settings are read when agents.core.config is first imported: give the required ones
+# placeholder values and keep the job, cache and checkpoint files out of the repo
+os.environ.setdefault("CORS_ORIGINS", '["*"]')
+os.environ.setdefault("PORT", "8000")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/test")
+os.environ.setdefault("TEST_DATABASE_URL", "postgresql://localhost/test")
+os.environ["DATA_ROOT"] = tempfile.mkdtemp(prefix="agents-tests-")
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from agents.core.admission import AdmissionController, AdmissionRejected
+
+async def hold(controller: AdmissionController, name: str, order: list, release: asyncio.Event, wait: bool = False) -> None:
+    async with controller.admit(wait=wait):
+        order.append(name)
+        await release.wait()
+
+def test_runs_queue_in_arrival_order_and_overflow_is_rejected():
+    async def main():
+        controller = AdmissionController(max_active=1, max_queued=2)
+        order = []
+        release = asyncio.Event()
+        runs = [asyncio.create_task(hold(controller, name, order, release)) for name in "abc"]
+        await asyncio.sleep(0)
+        assert (controller.active, controller.queued) == (1, 2)
+        with pytest.raises(AdmissionRejected):
+            async with controller.admit():
+                pass
+        release.set()
+        await asyncio.gather(*runs)
+        assert order == ["a", "b", "c"]
+        assert (controller.active, controller.queued) == (0, 0)
+
+    asyncio.run(main())
+
+def test_waiting_callers_queue_past_the_limit():
+    async def main():
+        controller = AdmissionController(max_active=1, max_queued=0)
+        order = []
+        release = asyncio.Event()
+        first = asyncio.create_task(hold(controller, "a", order, release))
+        await asyncio.sleep(0)
+        batch = asyncio.create_task(hold(controller, "batch", order, release, wait=True))
+        await asyncio.sleep(0)
+        assert controller.queued == 1
+        release.set()
+        await asyncio.gather(first, batch)
+        assert order == ["a", "batch"]
+
+    asyncio.run(main())
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def main():
+        controller = AdmissionController(max_active=1, max_queued=1)
+        order = []
+        release = asyncio.Event()
+        first = asyncio.create_task(hold(controller, "a", order, release))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold(controller, "b", order, release))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert controller.queued == 0
+        release.set()
+        await first
+        assert order == ["a"] and controller.active == 0
+
+    asyncio.run(main())
+
+def test_retry_after_scales_with_queue_and_slots():
+    async def main():
+        controller = AdmissionController(max_active=2, max_queued=1, default_run_seconds=10)
+        assert controller.retry_after() == 5
+        release = asyncio.Event()
+        runs = [asyncio.create_task(hold(controller, name, [], release)) for name in "abc"]
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with controller.admit():
+                pass
+        # One queued run ahead of it, two slots: (1 + 1) * 10 / 2
+        assert rejected.value.retry_after == 10
+        release.set()
+        await asyncio.gather(*runs)
+
+    asyncio.run(main())
+
+def test_max_active_must_allow_a_run():
+    with pytest.raises(ValueError):
+        AdmissionController(max_active=0, max_queued=1)
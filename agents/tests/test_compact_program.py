@@ -0,0 +1,64 @@
+import pytest
+
+from agents.core.compact_program import compact_program, expand_week
+from agents.models.workout import Circuit, CompactProgram, ExerciseSet, MovementPrep, WorkoutPlan
+
+def day_plan(*exercises: ExerciseSet) -> WorkoutPlan:
+    prep = MovementPrep(name="Prep", foam_rolling=["Quads"], dynamic_stretches=["Leg Swings"], activation_exercises=["Glute Bridge"])
+    return WorkoutPlan(
+        day="A",
+        movement_prep=[prep],
+        power="Box Jump",
+        circuit_1=Circuit(exercises=list(exercises), rounds=3, rest=60),
+        circuit_2=Circuit(exercises=[ExerciseSet(name="Plank", reps=3, rpe=6)], rounds=3, rest=60),
+        finisher="Bike Sprints",
+    )
+
+def round_trip(base: WorkoutPlan, week_2: WorkoutPlan) -> WorkoutPlan:
+    program = compact_program([[base], [week_2]])
+    return expand_week(program, 2)[0]
+
+def test_name_only_change_keeps_exercise_id():
+    base = day_plan(ExerciseSet(name="Goblet Squat", exercise_id="ex-1", reps=10, rpe=6))
+    week_2 = day_plan(ExerciseSet(name="Goblet Box Squat", exercise_id="ex-1", reps=10, rpe=6))
+    assert round_trip(base, week_2) == week_2
+
+def test_name_change_to_variant_without_id_clears_exercise_id():
+    base = day_plan(ExerciseSet(name="Goblet Squat", exercise_id="ex-1", reps=10, rpe=6))
+    week_2 = day_plan(ExerciseSet(name="Split Squat", reps=10, rpe=6))
+    assert round_trip(base, week_2).circuit_1.exercises[0].exercise_id is None
+
+def test_name_and_id_change_round_trips():
+    base = day_plan(ExerciseSet(name="Goblet Squat", exercise_id="ex-1", reps=10, rpe=6))
+    week_2 = day_plan(ExerciseSet(name="Split Squat", exercise_id="ex-2", reps=12, rpe=7))
+    assert round_trip(base, week_2) == week_2
+
+def test_reps_change_keeps_name_and_id():
+    base = day_plan(ExerciseSet(name="Goblet Squat", exercise_id="ex-1", reps=10, rpe=6))
+    week_2 = day_plan(ExerciseSet(name="Goblet Squat", exercise_id="ex-1", reps=12, rpe=6))
+    program = compact_program([[base], [week_2]])
+    (change,) = program.weeks[0].days[0].circuit_1.exercises
+    assert change.model_dump(exclude_none=True) == {"index": 0, "reps": 12}
+    assert expand_week(program, 2)[0] == week_2
+
+def test_exercise_id_cleared_without_rename_round_trips():
+    base = day_plan(ExerciseSet(name="Goblet Squat", exercise_id="ex-1", reps=10, rpe=6))
+    week_2 = day_plan(ExerciseSet(name="Goblet Squat", reps=10, rpe=6))
+    program = compact_program([[base], [week_2]])
+    # Through JSON too, as the program cache stores it
+    reloaded = CompactProgram.model_validate(program.model_dump(exclude_none=True))
+    assert expand_week(program, 2)[0] == week_2
+    assert expand_week(reloaded, 2)[0] == week_2
+
+def test_reordered_days_are_matched_by_letter():
+    day_a = day_plan(ExerciseSet(name="Goblet Squat", reps=10, rpe=6))
+    day_b = day_plan(ExerciseSet(name="Push Up", reps=8, rpe=6)).model_copy(update={"day": "B"})
+    week_2_a = day_a.model_copy(update={"power": "Broad Jump"})
+    week_2_b = day_b.model_copy(update={"finisher": "Rower"})
+    program = compact_program([[day_a, day_b], [week_2_b, week_2_a]])
+    assert expand_week(program, 2) == [week_2_a, week_2_b]
+
+def test_duplicate_day_letters_are_rejected():
+    day_a = day_plan(ExerciseSet(name="Goblet Squat", reps=10, rpe=6))
+    with pytest.raises(ValueError):
+        compact_program([[day_a, day_a], [day_a, day_a]])
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from agents.core.concurrency import gather_bounded
+
+def test_results_keep_item_order_within_limit():
+    in_flight = 0
+    peak = 0
+
+    async def call(item: int) -> int:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Later items finish first
+        await asyncio.sleep(0.01 * (5 - item))
+        in_flight -= 1
+        return item * 10
+
+    assert asyncio.run(gather_bounded(range(5), call, limit=2)) == [0, 10, 20, 30, 40]
+    assert peak == 2
+
+def test_failed_calls_are_retried():
+    attempts = []
+
+    async def flaky(item: str) -> str:
+        attempts.append(item)
+        if len(attempts) < 3:
+            raise ValueError("try again")
+        return item
+
+    assert asyncio.run(gather_bounded(["a"], flaky, limit=1, retries=2, backoff=0)) == ["a"]
+    assert len(attempts) == 3
+
+def test_last_failure_is_raised_once_retries_run_out():
+    attempts = []
+
+    async def failing(item: str) -> str:
+        attempts.append(item)
+        raise ValueError("still broken")
+
+    with pytest.raises(ValueError):
+        asyncio.run(gather_bounded(["a"], failing, limit=1, retries=2, backoff=0))
+    assert len(attempts) == 3
+
+def test_timed_out_calls_are_not_retried():
+    attempts = []
+
+    async def slow(item: str) -> str:
+        attempts.append(item)
+        await asyncio.sleep(1)
+        return item
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(gather_bounded(["a"], slow, limit=1, timeout=0.01, retries=3, backoff=0))
+    assert len(attempts) == 1
@@ -0,0 +1,57 @@
+from agents.services.exercise_catalog import ExerciseIndex
+
+def exercise(id: str, name: str, **facets) -> dict:
+    return {"id": id, "name": name, **facets}
+
+INDEX = ExerciseIndex(
+    [
+        exercise("5", "Split Squat", body=["Lower"], plane=["Sagittal"], equipment=["Dumbbell"], isFree=True),
+        exercise("1", "Goblet Squat", body=["Lower"], plane=["Sagittal"], equipment=["Kettlebell", "Dumbbell"], isFree=True),
+        exercise("3", "Push Up", body=["Upper"], plane=["Sagittal"], isFree=True),
+        exercise("2", "Lateral Lunge", body=["Lower"], plane=["Frontal"], isFree=False),
+        exercise("4", "Cossack Squat", body=["Lower"], plane=["Frontal"], isFree=False),
+        exercise("6", "Squat Jump", body=["Lower"], plane=["Sagittal"]),
+    ],
+    version=(None, 6),
+)
+
+def names(bits: int) -> list:
+    positions, _ = INDEX.page(bits, limit=len(INDEX.records))
+    return [INDEX.records[position]["name"] for position in positions]
+
+def test_facet_matches_any_value_and_facets_combine():
+    assert names(INDEX.match(plane=["Frontal"])) == ["Cossack Squat", "Lateral Lunge"]
+    assert names(INDEX.match(plane=["Frontal", "Sagittal"], body=["Upper"])) == ["Push Up"]
+    assert names(INDEX.match(equipment=["Dumbbell"], isFree=["true"])) == ["Goblet Squat", "Split Squat"]
+    assert INDEX.match(body=["Upper"], plane=["Frontal"]) == 0
+
+def test_empty_filters_match_everything():
+    assert INDEX.match(q="", body=None, plane=[""]) == INDEX.all_bits
+
+def test_text_matches_every_word_in_any_order():
+    assert names(INDEX.match(q="squat")) == ["Cossack Squat", "Goblet Squat", "Split Squat", "Squat Jump"]
+    assert names(INDEX.match(q="JUMP squat")) == ["Squat Jump"]
+
+def test_facet_counts_ignore_the_facets_own_filter():
+    counts = INDEX.facet_counts(q="squat", plane=["Frontal"])
+    # Plane counts what each plane would return with only the text filter
+    assert counts["plane"] == {"Frontal": 1, "Sagittal": 3}
+    # Other facets are counted against both filters
+    assert counts["body"] == {"Lower": 1}
+    assert counts["isFree"] == {"false": 1}
+
+def test_cursor_pages_through_every_match_once():
+    bits = INDEX.match(body=["Lower"])
+    seen = []
+    cursor = None
+    while True:
+        positions, cursor = INDEX.page(bits, limit=2, after=cursor)
+        seen += [INDEX.records[position]["id"] for position in positions]
+        if cursor is None:
+            break
+    assert seen == ["4", "1", "2", "5", "6"]
+
+def test_last_full_page_has_no_cursor():
+    bits = INDEX.match(plane=["Frontal"])
+    positions, cursor = INDEX.page(bits, limit=2)
+    assert len(positions) == 2 and cursor is None
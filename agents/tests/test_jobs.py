@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+from agents.core.jobs import JobManager, JobStatus, JobStore
+
+def test_claim_takes_queued_jobs_oldest_first(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    first = store.create("program", {"n": 1})
+    second = store.create("program", {"n": 2})
+    assert store.claim("a", lease=60).id == first.id
+    assert store.claim("b", lease=60).id == second.id
+    assert store.claim("c", lease=60) is None
+    assert store.get(first.id).status == JobStatus.running
+
+def test_expired_lease_is_reclaimed_and_only_the_new_owner_finishes(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job = store.create("program", {})
+    store.claim("a", lease=0.05)
+    assert store.claim("b", lease=60) is None
+    time.sleep(0.1)
+    assert store.claim("b", lease=60).id == job.id
+    assert not store.renew(job.id, "a", lease=60)
+    assert not store.mark_succeeded(job.id, "a", {"from": "a"})
+    assert not store.mark_failed(job.id, "a", "error from a")
+    assert store.mark_succeeded(job.id, "b", {"from": "b"})
+    finished = store.get(job.id)
+    assert finished.status == JobStatus.succeeded and finished.result == {"from": "b"}
+
+def test_finished_job_cant_be_marked_again(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job = store.create("program", {})
+    store.claim("a", lease=60)
+    assert store.mark_failed(job.id, "a", "boom")
+    assert not store.mark_succeeded(job.id, "a", {})
+    assert store.get(job.id).status == JobStatus.failed
+
+def test_release_puts_the_job_back_for_any_worker(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job = store.create("program", {})
+    store.claim("a", lease=60)
+    store.release(job.id, "b")
+    assert store.get(job.id).status == JobStatus.running
+    store.release(job.id, "a")
+    assert store.claim("b", lease=60).id == job.id
+
+class LeaseLosingStore(JobStore):
+    """A store where every renewal fails, as if another worker had reclaimed the job."""
+
+    def renew(self, job_id: str, owner: str, lease: float) -> bool:
+        return False
+
+def test_lost_lease_stops_the_job_and_the_worker_carries_on(tmp_path):
+    store = LeaseLosingStore(tmp_path / "jobs.sqlite3")
+    cancelled = asyncio.Event()
+
+    async def handler(params):
+        if params["slow"]:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return params
+
+    async def main():
+        manager = JobManager(store, workers=1, lease=0.15, poll_interval=0.01)
+        manager.register("program", handler)
+        await manager.start()
+        try:
+            slow = manager.submit("program", {"slow": True})
+            await asyncio.wait_for(cancelled.wait(), 1)
+            fast = manager.submit("program", {"slow": False})
+            for _ in range(100):
+                if store.get(fast.id).status == JobStatus.succeeded:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await manager.stop()
+        # The lost job is left to its new owner rather than marked here
+        assert store.get(slow.id).status == JobStatus.running
+        assert store.get(fast.id).status == JobStatus.succeeded
+
+    asyncio.run(main())
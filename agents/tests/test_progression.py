@@ -0,0 +1,60 @@
+from agents.core.cfsc_catalog import ExerciseCatalog
+from agents.core.progression import ProgressionRules
+from agents.models.workout import ExerciseSet
+
+CATALOG = ExerciseCatalog.from_file()
+
+def progressed(rules: ProgressionRules, reps: int, rpe: int, name: str = "Goblet Squat") -> ExerciseSet:
+    baseline = ExerciseSet(name=name, exercise_id="ex-1", reps=10, rpe=6)
+    return rules.progress_set(baseline.model_copy(update={"reps": reps, "rpe": rpe}), baseline)
+
+def test_reps_go_up_until_the_cap():
+    assert progressed(ProgressionRules(), reps=10, rpe=6).reps == 12
+    # Odd reps land on the cap rather than past it
+    assert progressed(ProgressionRules(), reps=13, rpe=6).reps == 14
+
+def test_rpe_goes_up_and_reps_reset_at_the_cap():
+    exercise = progressed(ProgressionRules(), reps=14, rpe=6)
+    assert (exercise.reps, exercise.rpe, exercise.exercise_id) == (8, 7, "ex-1")
+
+def test_plateau_without_a_next_variant_holds_at_the_cap():
+    exercise = progressed(ProgressionRules(), reps=14, rpe=9)
+    assert (exercise.name, exercise.reps, exercise.rpe) == ("Goblet Squat", 14, 9)
+
+def first_with_progression(category: str) -> str:
+    return next(
+        variant.name
+        for group in CATALOG.data.categories[category]
+        for variant in group.variants
+        if CATALOG.next_progression(variant.name, category, strict=True)
+    )
+
+def test_plateau_moves_to_the_next_variant_from_baseline():
+    name = next(
+        variant.name
+        for category in CATALOG.categories if category != "Power"
+        for group in CATALOG.data.categories[category]
+        for variant in group.variants
+        if CATALOG.next_progression(variant.name)
+    )
+    exercise = progressed(ProgressionRules(CATALOG), reps=14, rpe=9, name=name)
+    assert exercise.name == CATALOG.next_progression(name)
+    # A sheet variant has no library id, and starts over from week 1's reps and RPE
+    assert (exercise.exercise_id, exercise.reps, exercise.rpe) == (None, 10, 6)
+
+def test_power_steps_every_few_weeks_within_the_power_category():
+    rules = ProgressionRules(CATALOG, power_step_weeks=2)
+    power = first_with_progression("Power")
+    assert rules.progress_power(power, week_index=1) == power
+    assert rules.progress_power(power, week_index=2) == CATALOG.next_progression(power, "Power", strict=True)
+
+def test_power_only_found_in_other_categories_is_kept():
+    rules = ProgressionRules(CATALOG, power_step_weeks=1)
+    name = next(
+        variant.name
+        for category in CATALOG.categories if category != "Power"
+        for group in CATALOG.data.categories[category]
+        for variant in group.variants
+        if CATALOG.next_progression(variant.name, "Power") and CATALOG.find(variant.name, "Power", strict=True) is None
+    )
+    assert rules.progress_power(name, week_index=1) == name
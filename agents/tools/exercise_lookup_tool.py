@@ -0,0 +1,77 @@
+import json
+from typing import List, Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from agents.core.database import database
+from agents.models.exercise import ExerciseSearch
+from agents.models.movement import BalanceType, ExerciseAngle, MovementPattern, MovementPlane
+from agents.services.exercise_service import search_exercises
+
+# Enough for the agent to choose and link an exercise, nothing more
+LOOKUP_FIELDS = ["id", "name", "pattern", "plane", "balance", "equipment"]
+LOOKUP_TIMEOUT = 10.0
+
+def _value(item):
+    # Arguments may arrive as enum members or plain strings
+    return getattr(item, "value", item)
+
+class ExerciseLookupInput(BaseModel):
+    pattern: MovementPattern = Field(..., description="The movement pattern of the exercise")
+    angle: Optional[ExerciseAngle] = Field(default=None, description="The angle of the movement; exercises named with it are listed first")
+    balance: Optional[BalanceType] = Field(default=None, description="bilateral or unilateral")
+    plane: Optional[List[MovementPlane]] = Field(default=None, description="Planes of motion to allow")
+    equipment: Optional[List[str]] = Field(default=None, description="Equipment to allow, e.g. bodyweight, dumbbell, kettlebell")
+    q: Optional[str] = Field(default=None, description="Words that must appear in the exercise name")
+    limit: int = Field(default=5, ge=1, le=20, description="Most candidates to return")
+
+class ExerciseLookupTool(BaseTool):
+    """
+    Resolves an ExerciseType (pattern/angle/balance) to a short list of real
+    exercises from the exercise library, through the in-memory exercise catalog.
+    Crews call tools from worker threads, so the lookup runs on the app's event
+    loop where the shared Prisma client lives.
+    """
+    name: str = "exercise_lookup"
+    description: str = (
+        "Find exercises in the exercise library that match a movement pattern, and optionally an angle, "
+        "balance type, planes of motion or equipment. Returns a JSON list of candidates with their id and name. "
+        "Use one call per exercise slot and copy the chosen exercise's id into exercise_id."
+    )
+    args_schema: Type[BaseModel] = ExerciseLookupInput
+
+    def _run(
+        self,
+        pattern: str,
+        angle: Optional[str] = None,
+        balance: Optional[str] = None,
+        plane: Optional[List[str]] = None,
+        equipment: Optional[List[str]] = None,
+        q: Optional[str] = None,
+        limit: int = 5,
+    ) -> str:
+        angle = _value(angle) if angle else None
+        search = ExerciseSearch(
+            pattern=[_value(pattern)],
+            balance=[_value(balance)] if balance else None,
+            plane=[_value(item) for item in plane] if plane else None,
+            equipment=equipment,
+            q=q,
+            # Over-fetch so exercises matching the angle can be moved to the front
+            limit=limit * 4 if angle else limit,
+            fields=LOOKUP_FIELDS,
+        )
+        try:
+            page = database.run_from_thread(lambda prisma: search_exercises(prisma, search), LOOKUP_TIMEOUT)
+        except Exception as e:
+            return f"Exercise library unavailable ({e!r}); use the knowledge source instead."
+
+        candidates = page.items
+        if angle:
+            # The library has no angle column; names like "Horizontal Row" are the best signal
+            candidates = sorted(candidates, key=lambda exercise: angle.lower() not in exercise["name"].lower())
+        candidates = candidates[:limit]
+        if not candidates:
+            return "No matching exercises in the library; loosen the filters or use the knowledge source."
+        return json.dumps(candidates, default=str)
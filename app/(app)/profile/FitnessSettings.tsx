@@ -121,6 +121,12 @@ export function FitnessSettings({ fitnessProfile }: { fitnessProfile: typeof Fit
   const [isDialogOpen, setIsDialogOpen] = useState(false);
   const [events, setEvents] = useState<Array<{ type: string; message: string; timestamp: number }>>([]);
   const eventSourceRef = useRef<EventSource | null>(null);
+  // Identifies this generation so the events stream only receives its own events
+  const [runId, setRunId] = useState('');
+
+  useEffect(() => {
+    setRunId(crypto.randomUUID());
+  }, []);
 
   useEffect(() => {
     if (profileState?.success) {
@@ -148,7 +154,7 @@ export function FitnessSettings({ fitnessProfile }: { fitnessProfile: typeof Fit
       setEvents([]);
       
       // Create new EventSource connection with the full URL
-      const eventSource = new EventSource(`${API_BASE_URL}/programs/parq_program/events`);
+      const eventSource = new EventSource(`${API_BASE_URL}/programs/parq_program/events?run_id=${encodeURIComponent(runId)}`);
       eventSourceRef.current = eventSource;
 
       eventSource.onmessage = (event) => {
@@ -185,7 +191,7 @@ export function FitnessSettings({ fitnessProfile }: { fitnessProfile: typeof Fit
         eventSourceRef.current = null;
       };
     }
-  }, [isDialogOpen]);
+  }, [isDialogOpen, runId]);
 
   const incomingFitnessGoals = Object.entries(fitnessProfile).reduce((result: string[], curr) => {
     let resultArr = result
@@ -319,6 +325,7 @@ export function FitnessSettings({ fitnessProfile }: { fitnessProfile: typeof Fit
   return (
     <>
       <Form action={dispatch} className="flex flex-col gap-y-4 overflow-hidden">
+        <input type="hidden" name="runId" value={runId} />
         <a ref={txtDownloadRef} style={{ display: "none" }} />
         <div className="text-muted-foreground">Keep your fitness profile up to date.</div>
         <ScrollArea className="h-[calc(100vh-12.5rem)]">
@@ -23,7 +23,15 @@ export function GenerateProgram() {
   const [programState, dispatch, pending] = useActionState(generateProgram, null)
   const [isDialogOpen, setIsDialogOpen] = useState(false);
   const [events, setEvents] = useState<Array<{ type: string; message: string; timestamp: number }>>([]);
+  // Program summary (markdown) as it streams in, token by token
+  const [summary, setSummary] = useState('');
   const eventSourceRef = useRef<EventSource | null>(null);
+  // Identifies this generation so the events stream only receives its own events
+  const [runId, setRunId] = useState('');
+
+  useEffect(() => {
+    setRunId(crypto.randomUUID());
+  }, []);
   
   // Handle program generation success and download
   useEffect(() => {
@@ -99,15 +107,21 @@ export function GenerateProgram() {
     if (isDialogOpen) {
       // Clear previous events
       setEvents([]);
+      setSummary('');
       
       // Create new EventSource connection with the full URL
-      const eventSource = new EventSource(`${API_BASE_URL}/programs/program_flow/events`);
+      const eventSource = new EventSource(`${API_BASE_URL}/programs/program_flow/events?run_id=${encodeURIComponent(runId)}`);
       eventSourceRef.current = eventSource;
 
       eventSource.onmessage = (event) => {
         const data = JSON.parse(event.data);
         let message = '';
         console.log("event data", data)
+        if (data.type === 'summary_token') {
+          // Tokens build up the summary in place rather than each becoming an event
+          setSummary(prev => prev + data.token);
+          return;
+        }
         switch(data.type) {
           case 'flow_started':
             message = `Flow ${data.flow_name ?? ''} started.`;
@@ -122,6 +136,12 @@ export function GenerateProgram() {
             message = `Flow ${data.flow_name ?? ''} finished.`;
             eventSource.close();
             break;
+          case 'summary_started':
+            message = `Writing the program summary...`;
+            break;
+          case 'summary_completed':
+            message = `Program summary complete.`;
+            break;
           case 'crew_started':
             message = `Crew ${data.crew_name} has started execution!`;
             break;
@@ -156,12 +176,13 @@ export function GenerateProgram() {
         eventSourceRef.current = null;
       };
     }
-  }, [isDialogOpen]);
+  }, [isDialogOpen, runId]);
 
   return (
     <>
       <Form action={dispatch} className="flex flex-col gap-y-4 overflow-hidden">
         <div className="text-muted-foreground">Generate a program based on the Functional Movement Screen (FMS).</div>
+        <input type="hidden" name="runId" value={runId} />
         <ScrollArea className="h-[calc(100vh-12.5rem)]">
           <div className="space-y-4">
             <Card>
@@ -314,6 +335,7 @@ export function GenerateProgram() {
         setIsDialogOpen(open);
         if (!open) {
           clearForm();
+          setRunId(crypto.randomUUID());
         }
       }}>
         <DialogContent className="max-w-2xl">
@@ -326,6 +348,13 @@ export function GenerateProgram() {
           <ScrollArea className="h-[400px] w-full rounded-md border p-4">
             <div className="space-y-4">
               {pending && events.length > 0 && <LoaderCircle className="w-4 h-4 animate-spin" /> }
+              {summary && (
+                <div className="space-y-2">
+                  <div className="text-sm font-medium">Program Summary</div>
+                  <div className="whitespace-pre-wrap text-sm">{summary}</div>
+                  <Separator />
+                </div>
+              )}
               {/* {events.map((event, index) => ( */}
                 {events.slice().reverse().map((event, index) => (
                 <div key={index} className="space-y-2">
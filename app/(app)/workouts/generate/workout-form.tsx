@@ -42,6 +42,12 @@ export function WorkoutForm() {
   const [isDialogOpen, setIsDialogOpen] = useState(false);
   const [events, setEvents] = useState<Array<{ type: string; message: string; timestamp: number }>>([]);
   const eventSourceRef = useRef<EventSource | null>(null);
+  // Identifies this generation so the events stream only receives its own events
+  const [runId, setRunId] = useState('');
+
+  useEffect(() => {
+    setRunId(crypto.randomUUID());
+  }, []);
 
   const totalSteps = 4;
   const progress = (Object.values(formData).filter(value => value !== null).length / Object.keys(formData).length) * 100;
@@ -217,7 +223,7 @@ export function WorkoutForm() {
       setEvents([]);
       
       // Create new EventSource connection with the full URL
-      const eventSource = new EventSource(`${API_BASE_URL}/programs/parq_program/events`);
+      const eventSource = new EventSource(`${API_BASE_URL}/workouts/generate_workout/events?run_id=${encodeURIComponent(runId)}`);
       eventSourceRef.current = eventSource;
 
       eventSource.onmessage = (event) => {
@@ -254,11 +260,12 @@ export function WorkoutForm() {
         eventSourceRef.current = null;
       };
     }
-  }, [isDialogOpen]);
+  }, [isDialogOpen, runId]);
 
   return (
     <>
       <Form action={dispatch} className="max-w-md mx-auto p-4">
+        <input type="hidden" name="runId" value={runId} />
         <Progress value={progress} className="mb-8" />
         
         <AnimatePresence mode="wait">
@@ -82,8 +82,8 @@ export default function SearchWorkoutPage() {
           {pending ? <LoaderCircle className="w-4 h-4 animate-spin" /> : "Search"}
         </Button>
       </Form>
-      <div className={cn("flex flex-col gap-2 mt-2 p-2 border border-border-muted rounded-md overflow-y-auto max-h-[100px] w-[250px]", state?.length > 0 ? "block" : "hidden")}>
-        {state?.map((exercise: any) => (
+      <div className={cn("flex flex-col gap-2 mt-2 p-2 border border-border-muted rounded-md overflow-y-auto max-h-[100px] w-[250px]", state?.items?.length > 0 ? "block" : "hidden")}>
+        {state?.items?.map((exercise: any) => (
           <div key={exercise.id} className="pb-1">{exercise.name}</div>
         ))}
       </div>
@@ -23,6 +23,8 @@ export async function searchExercise(prevState: unknown, formData: FormData) {
     exerciseFormData.append("body", body as string);
     exerciseFormData.append("plane", plane as string);
     exerciseFormData.append("pattern", pattern as string);
+    // The picker only shows names; keep the payload to what it renders
+    exerciseFormData.append("fields", "id,name");
     const exerciseResponse = await fetch(`${process.env.API_BASE_URL}/exercises/search`, {
       method: "POST",
       headers: {
@@ -203,7 +203,7 @@ export async function generateProgram(prevState: unknown, formData: FormData) {
     };
   }
 
-  const { deepSquat, hurdleStep, inlineLunge, shoulderMobility, activeStraightLegRaise, trunkStabilityPushUp, rotaryStability, coachNotes } = validatedFields.data;
+  const { deepSquat, hurdleStep, inlineLunge, shoulderMobility, activeStraightLegRaise, trunkStabilityPushUp, rotaryStability, coachNotes, runId } = validatedFields.data;
 
   try {
     const { userId } = await verifySession();
@@ -221,8 +221,9 @@ export async function generateProgram(prevState: unknown, formData: FormData) {
     programFormData.append("trunkStabilityPushUp", trunkStabilityPushUp)
     programFormData.append("rotaryStability", rotaryStability)
     programFormData.append("coachNotes", coachNotes)
-    // Generate workout with workout generator crew
-    const programResponse = await fetch(`${process.env.API_BASE_URL}/programs/program_flow/excel`, {
+    // Generate workout with workout generator crew, streaming events to this run's channel
+    const runParams = runId ? `?${new URLSearchParams({ run_id: runId }).toString()}` : "";
+    const programResponse = await fetch(`${process.env.API_BASE_URL}/programs/program_flow/excel${runParams}`, {
       method: "POST",
       headers: {
         'Accept': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
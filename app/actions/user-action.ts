@@ -95,6 +95,9 @@ export async function fitnessProfileActions(prevState: unknown, formData: FormDa
       clientParams.set("name", `${firstName} ${lastName}`);
       clientParams.set("age", "43");
       clientParams.set("email", email);
+      const runId = formData.get("runId");
+      // Same run ID as the dialog's events stream, so it receives this program's events
+      runId && clientParams.set("run_id", runId as string);
       
       try {
         const programResponse = await fetch(`${process.env.API_BASE_URL}/programs/parq_program?${clientParams.toString()}`, {
@@ -180,7 +180,7 @@ export async function generateWorkout(prevState: unknown, formData: FormData) {
     };
   }
 
-  const { location, type, focus, time } = validatedFields.data;
+  const { location, type, focus, time, runId } = validatedFields.data;
 
   try {
     const { userId } = await verifySession();
@@ -196,7 +196,8 @@ export async function generateWorkout(prevState: unknown, formData: FormData) {
     workoutFormData.append("focus", focus)
     workoutFormData.append("time", time)
     // TODO: Generate workout with workout generator crew
-    const workoutResponse = await fetch(`${process.env.API_BASE_URL}/workouts/generate_workout`, {
+    const runParams = runId ? `?${new URLSearchParams({ run_id: runId }).toString()}` : "";
+    const workoutResponse = await fetch(`${process.env.API_BASE_URL}/workouts/generate_workout${runParams}`, {
       method: "POST",
       headers: {
         'Accept': 'application/json',
@@ -158,6 +158,7 @@ export const generateWorkoutSchema = z.object({
   type: z.string(),
   focus: z.string(),
   time: z.string(),
+  runId: z.string().optional(),
 })
 
 export const generateProgramSchema = z.object({
@@ -169,4 +170,5 @@ export const generateProgramSchema = z.object({
   trunkStabilityPushUp: z.string(),
   rotaryStability: z.string(),
   coachNotes: z.string(),
+  runId: z.string().optional(),
 })